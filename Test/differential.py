@@ -0,0 +1,369 @@
+"""Differential harness: optimised extraction paths against reference implementations.
+
+Generates (and optionally fuzzes) a synthetic upload per page, runs the
+reference implementation from reference.py on it, then every optimised path
+(the shared pipeline on the whole frame, chunk by chunk, and the parallel
+multi-file / multi-member readers) and asserts each output frame is identical,
+dtypes included. What users download is checked too: the result store's Arrow
+round trip, the pages' CSV download and the service's CSV, JSON Lines and
+Parquet encoders. The notebook extractors are checked the same way on a clean
+corpus with list descriptions, the only input they handle, over the columns
+they produce.
+
+    python Test/differential.py --rows 2000 --seeds 0 1 2 --fuzz 0 0.2
+    python Test/differential.py --pages Aggregated --fuzz 0.5
+
+References keep date and quarter columns as raw text; the harness types them
+itself, one value at a time, without utils.dates. A date column is expected as
+datetimes (timezones converted to UTC) when every value parses, else unchanged.
+Page paths type dates over the whole result as the pages do; the service
+streams them untyped, so its output is checked against the raw reference.
+Exits non-zero if any path differs from its reference.
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import zipfile
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+import reference
+import synthetic
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import service  # noqa: E402
+from utils.dates import DATE_COLUMNS, QUARTER_COLUMNS, parse_date_columns  # noqa: E402
+from utils.export import table_csv  # noqa: E402
+from utils.extractors import COMPANY_BF_COLUMNS, SIGNAL_BF_COLUMNS, extract_company_bf, extract_signal_bf  # noqa: E402
+from utils.ingest import ingest_files  # noqa: E402
+from utils.pipelines import PIPELINES  # noqa: E402
+from utils.store import ResultStore  # noqa: E402
+from utils.text import clean_text_columns  # noqa: E402
+from utils.uploads import iter_chunks, read_path  # noqa: E402
+
+# Odd chunk size so chunk boundaries land mid-company
+CHUNK_ROWS = 97
+PARTS = 4
+# Values the reference extractors (or read_csv) leave for a missing date
+PLACEHOLDERS = {'', '-', 'N/A', 'nan', 'NaN', 'None', 'NaT'}
+
+# Page -> (pipeline, page reference, notebook reference or None, extractor and columns for ingest_files or None)
+PAGES = {
+    'Signal BF': ('signal-bf', reference.page_signal_bf, reference.notebook_signal_bf, (extract_signal_bf, SIGNAL_BF_COLUMNS)),
+    'Company BF': ('company-bf', reference.page_company_bf, reference.notebook_company_bf, (extract_company_bf, COMPANY_BF_COLUMNS)),
+    'BF Consolidated': ('bf-consolidated', reference.page_bf_consolidated, None, None),
+    'Consolidated All': ('consolidated-all', reference.page_consolidated_all, None, None),
+    'Aggregated': ('aggregated', reference.page_aggregated, None, None),
+}
+
+
+# -------------------------- Inputs -------------------------- #
+
+def _split_csv(data, parts):
+    """Splits CSV bytes into `parts` CSV byte strings with the header repeated, keeping row order."""
+    rows = list(csv.reader(io.StringIO(data.decode('utf-8'))))
+    header, body = rows[0], rows[1:]
+    size = -(-len(body) // parts)
+    chunks = []
+    for start in range(0, len(body), size):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\r\n')
+        writer.writerow(header)
+        writer.writerows(body[start:start + size])
+        chunks.append(buffer.getvalue().encode('utf-8'))
+    return chunks
+
+
+def _listify_descriptions(data, column):
+    """Rewrites every JSON description in `column` as a list of sentences, as the notebooks expect."""
+    reader = csv.DictReader(io.StringIO(data.decode('utf-8')))
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=reader.fieldnames)
+    writer.writeheader()
+    for row in reader:
+        priorities = json.loads(row[column])
+        for items in priorities.values():
+            for item in items:
+                if not isinstance(item['description'], list):
+                    item['description'] = [item['description']]
+        row[column] = json.dumps(priorities)
+        writer.writerow(row)
+    return buffer.getvalue().encode('utf-8')
+
+
+def _write(directory, name, data):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+# -------------------------- Paths -------------------------- #
+
+# Page paths finish with parse_date_columns over the whole result, as the pages do
+
+def run_pipeline(pipeline, path):
+    return parse_date_columns(PIPELINES[pipeline][1](pd.read_csv(path)))
+
+
+def run_chunked(pipeline, path, name):
+    """The pages' low-memory mode: the pipeline chunk by chunk, dates typed once the chunks are merged."""
+    frames = [PIPELINES[pipeline][1](chunk) for chunk in iter_chunks(path, name, chunksize=CHUNK_ROWS)]
+    return parse_date_columns(pd.concat(frames, ignore_index=True))
+
+
+def run_parallel_files(extractor, columns, part_paths):
+    """The Company/Signal BF page path: ingest_files over several files, then the page's cleaning."""
+    files = [(os.path.basename(path), path) for path in part_paths]
+    extracted_df, report = ingest_files(files, extractor, columns, max_workers=PARTS)
+    if (report['Error'] != '').any():
+        raise RuntimeError(f"ingest_files failed: {report['Error'].tolist()}")
+    extracted_df = extracted_df.drop(columns=['Source File'])
+    clean_text_columns(extracted_df, ['Description'])
+    return parse_date_columns(extracted_df)
+
+
+def run_parallel_zip(pipeline, zip_path):
+    """read_path over a zip reads its members in parallel workers, then the pipeline runs on the merged frame."""
+    return parse_date_columns(PIPELINES[pipeline][1](read_path(zip_path, os.path.basename(zip_path), max_workers=PARTS)))
+
+
+def run_store(store, key, pipeline, path):
+    """The pipeline output written to and read back from the result store, as the pages display it."""
+    handle = store.put(key, run_pipeline(pipeline, path))
+    try:
+        return handle.table.to_pandas()
+    finally:
+        handle.release()
+
+
+def run_download_csv(store, key, pipeline, path):
+    """The pages' CSV download of the stored result."""
+    handle = store.put(key, run_pipeline(pipeline, path))
+    try:
+        return table_csv(handle.table)
+    finally:
+        handle.release()
+
+
+def run_service(output_format, pipeline, path, name):
+    """The service's response body: each chunk extracted and encoded as it arrives, dates left untyped."""
+    encoder = service.ENCODERS[output_format]()
+    body = b''.join(encoder.encode(PIPELINES[pipeline][1](chunk)) for chunk in iter_chunks(path, name, chunksize=CHUNK_ROWS))
+    body += encoder.close()
+    return pq.read_table(io.BytesIO(body)).to_pandas() if output_format == 'parquet' else body
+
+
+# -------------------------- Expected Output -------------------------- #
+
+def _is_placeholder(value):
+    return pd.isna(value) or str(value).strip() in PLACEHOLDERS
+
+
+def _expected_dates(raw):
+    """Parses each value on its own; if any real value does not parse, the column must stay as it was."""
+    parsed = []
+    for value in raw:
+        if _is_placeholder(value):
+            parsed.append(pd.NaT)
+            continue
+        try:
+            stamp = pd.Timestamp(str(value).strip())
+        except ValueError:
+            return raw
+        parsed.append(stamp.tz_convert('UTC').tz_localize(None) if stamp.tzinfo else stamp)
+    return pd.Series(pd.DatetimeIndex(parsed, dtype='datetime64[us]'), index=raw.index, name=raw.name)
+
+
+def _expected_quarters(raw):
+    """Reads 'YYYY Qn', 'Qn-YYYY', 'YYYYQn' and the like; if any other label is present, the column must stay as it was."""
+    periods = []
+    for value in raw:
+        text = '' if _is_placeholder(value) else re.sub(r'[\s\-/]', '', str(value)).upper()
+        if text.startswith('Q'):
+            text = text[2:] + text[:2]
+        if text and not re.fullmatch(r'\d{4}Q[1-4]', text):
+            return raw
+        periods.append(pd.Period(text, freq='Q') if text else pd.NaT)
+    return pd.Series(pd.PeriodIndex(periods, freq='Q'), index=raw.index, name=raw.name)
+
+
+def expected_frame(raw):
+    """Types the raw date and quarter columns of a reference output the way the pages are meant to."""
+    typed = raw.copy()
+    for col in typed.columns:
+        if col in DATE_COLUMNS:
+            typed[col] = _expected_dates(typed[col])
+        elif col in QUARTER_COLUMNS:
+            typed[col] = _expected_quarters(typed[col])
+    return typed
+
+
+def stored_frame(expected):
+    """What the result store should hand back: quarters become '2024Q3' labels, everything else is unchanged."""
+    stored = expected.copy()
+    for col in stored.columns:
+        if isinstance(stored[col].dtype, pd.PeriodDtype):
+            labels = [None if pd.isna(p) else f"{p.year}Q{p.quarter}" for p in stored[col]]
+            stored[col] = pd.Series(labels, index=stored.index, dtype='str')
+    return stored
+
+
+def _csv(df):
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def _jsonl(df):
+    return df.to_json(orient='records', lines=True, date_format='iso').rstrip('\n').encode('utf-8') + b'\n' if len(df) else b''
+
+
+def expected_outputs(raw):
+    """The expected frame and each downloadable form of it, keyed by the form a path produces."""
+    frame = expected_frame(raw)
+    stored = stored_frame(frame)
+    return {
+        'frame': frame,
+        'stored': stored,
+        'csv': _csv(stored),
+        'raw stored': raw,
+        'raw csv': _csv(raw),
+        'raw jsonl': _jsonl(raw),
+    }
+
+
+# -------------------------- Comparison -------------------------- #
+
+def _timed(fn, *args):
+    # References print a warning per invalid row
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def compare(expected, actual, columns=None):
+    """Returns '' if the frames (or bytes) are identical, over `columns` if given, else the first difference."""
+    if isinstance(expected, bytes):
+        if expected == actual:
+            return ''
+        lines = expected.splitlines(), actual.splitlines()
+        line = next((i for i, pair in enumerate(zip(*lines)) if pair[0] != pair[1]), min(map(len, lines)))
+        return f"line {line + 1}: expected {lines[0][line:line + 1]!r}, got {lines[1][line:line + 1]!r}"[:200]
+    if columns is not None:
+        missing = [col for col in columns if col not in actual.columns]
+        if missing:
+            return f"missing columns: {missing}"
+        actual = actual[columns]
+    try:
+        pd.testing.assert_frame_equal(expected.reset_index(drop=True), actual.reset_index(drop=True))
+    except AssertionError as e:
+        return ' '.join(str(e).split())[:200]
+    return ''
+
+
+def check_page(page, rows, seed, fuzz, directory, store):
+    pipeline, page_reference, notebook_reference, ingest = PAGES[page]
+    name, data = synthetic.BUILDERS[page](rows, seed=seed, fuzz=fuzz)
+    path = _write(directory, name, data)
+    part_paths = [_write(directory, f"part{i}_{name}", part) for i, part in enumerate(_split_csv(data, PARTS))]
+    zip_path = os.path.join(directory, f"{name}.zip")
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        for part_path in part_paths:
+            archive.write(part_path, os.path.basename(part_path))
+
+    key = f"{page}:{seed}:{fuzz}"
+    # Path -> (run, expected form)
+    checks = [('Page', page_reference, path, {
+        'Pipeline': (lambda: run_pipeline(pipeline, path), 'frame'),
+        'Chunked': (lambda: run_chunked(pipeline, path, name), 'frame'),
+        'Parallel Zip': (lambda: run_parallel_zip(pipeline, zip_path), 'frame'),
+        'Store': (lambda: run_store(store, key, pipeline, path), 'stored'),
+        'Download CSV': (lambda: run_download_csv(store, key, pipeline, path), 'csv'),
+        'Service CSV': (lambda: run_service('csv', pipeline, path, name), 'raw csv'),
+        'Service JSONL': (lambda: run_service('jsonl', pipeline, path, name), 'raw jsonl'),
+        'Service Parquet': (lambda: run_service('parquet', pipeline, path, name), 'raw stored'),
+    })]
+    if ingest is not None:
+        checks[0][3]['Parallel Files'] = (lambda: run_parallel_files(*ingest, part_paths), 'frame')
+    if notebook_reference is not None and not fuzz:
+        notebook_path = _write(directory, f"notebook_{name}", _listify_descriptions(data, 'Formatted Priorities'))
+        checks.append(('Notebook', notebook_reference, notebook_path, {
+            'Pipeline': (lambda: run_pipeline(pipeline, notebook_path), 'frame'),
+        }))
+
+    report = []
+    for reference_name, reference_fn, reference_path, paths in checks:
+        raw, reference_seconds = _timed(lambda: reference_fn(pd.read_csv(reference_path)))
+        expected = expected_outputs(raw)
+        columns = list(raw.columns) if reference_name == 'Notebook' else None
+        for path_name, (run, form) in paths.items():
+            try:
+                actual, seconds = _timed(run)
+                difference = compare(expected[form], actual, columns)
+            except Exception as e:
+                actual, seconds, difference = pd.DataFrame(), float('nan'), f"{type(e).__name__}: {e}"
+            report.append({
+                'Page': page,
+                'Reference': reference_name,
+                'Path': path_name,
+                'Seed': seed,
+                'Fuzz': fuzz,
+                'Input Rows': rows,
+                'Output Rows': len(raw),
+                'Reference s': round(reference_seconds, 3),
+                'Path s': round(seconds, 3),
+                'Speedup': round(reference_seconds / seconds, 2) if seconds else float('nan'),
+                'Identical': not difference,
+                'Difference': difference,
+            })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', nargs='+', default=list(PAGES), choices=list(PAGES))
+    parser.add_argument('--rows', type=int, default=1000, help='input rows per synthetic file')
+    parser.add_argument('--seeds', nargs='+', type=int, default=[0, 1])
+    parser.add_argument('--fuzz', nargs='+', type=float, default=[0.0, 0.2], help='share of corrupted cells and priorities')
+    parser.add_argument('--csv', help='also write the report to this CSV path')
+    args = parser.parse_args()
+
+    report = []
+    with tempfile.TemporaryDirectory() as directory:
+        store = ResultStore(os.path.join(directory, 'store'))
+        for page in args.pages:
+            for seed in args.seeds:
+                for fuzz in args.fuzz:
+                    report.extend(check_page(page, args.rows, seed, fuzz, directory, store))
+
+    columns = [col for col in report[0] if col != 'Difference']
+    widths = {col: max(len(col), *(len(str(row[col])) for row in report)) for col in columns}
+    print('  '.join(col.ljust(widths[col]) for col in columns))
+    for row in report:
+        print('  '.join(str(row[col]).ljust(widths[col]) for col in columns))
+
+    failures = [row for row in report if not row['Identical']]
+    for row in failures:
+        print(f"\n❌ {row['Page']} / {row['Path']} vs {row['Reference']} (seed {row['Seed']}, fuzz {row['Fuzz']}): {row['Difference']}")
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(report[0]))
+            writer.writeheader()
+            writer.writerows(report)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
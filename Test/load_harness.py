@@ -0,0 +1,211 @@
+"""Concurrent-user load test for the Streamlit pages.
+
+Runs each page through Streamlit's AppTest in N parallel sessions, each
+"uploading" its own synthetic file, and reports p50/p95 latency, throughput
+and server memory against the number of users. Streamlit serves every session
+from one process, so threads here contend for the same GIL, memory and result
+store the real server does.
+
+Memory is the RSS of this process plus its worker processes (ingest_files and
+read_path pools), sampled every RSS_SAMPLE_SECONDS while a batch runs. Shared
+pages are counted once per process, and workers shorter-lived than a sample
+interval can be missed. Without /proc (non-Linux) only this process is counted.
+
+    python Test/load_harness.py --users 1 2 4 8 --rows 2000
+    python Test/load_harness.py --pages "Consolidated All" --shared-file
+
+AppTest cannot drive st.file_uploader, so it is patched to hand each session
+the upload registered under its session id.
+"""
+import argparse
+import csv
+import io
+import os
+import resource
+import sys
+import threading
+import time
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import synthetic
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RUN_BUTTON = "🚀 Run Full Extraction"
+RSS_SAMPLE_SECONDS = 0.05
+_UPLOADS = {}
+_real_file_uploader = st.file_uploader
+
+
+class SyntheticUpload(io.BytesIO):
+    """Stands in for streamlit's UploadedFile."""
+
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+        self.type = 'text/csv'
+
+
+def _fake_file_uploader(label, *args, accept_multiple_files=False, **kwargs):
+    upload_id = st.session_state.get('_load_test_upload')
+    if upload_id is None or 'Optional' in label:
+        return [] if accept_multiple_files else None
+    name, data = _UPLOADS[upload_id]
+    upload = SyntheticUpload(name, data)
+    return [upload] if accept_multiple_files else upload
+
+
+def _proc_rss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _descendants(pid):
+    """PIDs of every live descendant of `pid`, from the parent ids in /proc/<pid>/stat."""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    # The command name may contain spaces, so split after its closing parenthesis
+                    parents.setdefault(int(f.read().rsplit(')', 1)[1].split()[1]), []).append(int(entry))
+            except (OSError, IndexError, ValueError):
+                pass
+    found, stack = [], [pid]
+    while stack:
+        children = parents.get(stack.pop(), [])
+        found.extend(children)
+        stack.extend(children)
+    return found
+
+
+def _rss_mb():
+    """RSS of this process and its worker processes."""
+    if not os.path.isdir('/proc'):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    pid = os.getpid()
+    return _proc_rss_mb(pid) + sum(_proc_rss_mb(child) for child in _descendants(pid))
+
+
+class PeakSampler(threading.Thread):
+    """Samples _rss_mb() in the background and keeps the peak."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak = _rss_mb()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(RSS_SAMPLE_SECONDS):
+            self.peak = max(self.peak, _rss_mb())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        return self.peak
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def run_session(page_path, upload_id, timeout, results):
+    at = AppTest.from_file(page_path, default_timeout=timeout)
+    at.session_state['_load_test_upload'] = upload_id
+    start = time.perf_counter()
+    at.run()
+    # Pages preview a sample first; confirm the full extraction like a user would
+    for button in at.button:
+        if button.label == RUN_BUTTON:
+            button.click().run()
+            break
+    elapsed = time.perf_counter() - start
+    failed = bool(at.exception) or any('❌' in e.value for e in at.error)
+    results.append((elapsed, failed))
+
+
+def run_batch(page, users, rows, shared_file, timeout):
+    builder = synthetic.BUILDERS[page]
+    upload_ids = []
+    for user in range(users):
+        upload_id = f"{page}:{0 if shared_file else user}"
+        if upload_id not in _UPLOADS:
+            _UPLOADS[upload_id] = builder(rows, seed=0 if shared_file else user)
+        upload_ids.append(upload_id)
+
+    page_path = os.path.join(ROOT, 'pages', f"{page}.py")
+    results = []
+    rss_before = _rss_mb()
+    threads = [threading.Thread(target=run_session, args=(page_path, upload_id, timeout, results))
+               for upload_id in upload_ids]
+    sampler = PeakSampler()
+    sampler.start()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    peak_rss = sampler.stop()
+    rss_after = _rss_mb()
+
+    latencies = [elapsed for elapsed, _ in results]
+    return {
+        'Page': page,
+        'Users': users,
+        'Rows per File': rows,
+        'p50 s': round(_percentile(latencies, 50), 3),
+        'p95 s': round(_percentile(latencies, 95), 3),
+        'Sessions/s': round(users / wall, 3),
+        'Input Rows/s': round(users * rows / wall),
+        'Failures': sum(failed for _, failed in results),
+        'RSS Before MB': round(rss_before, 1),
+        'RSS After MB': round(rss_after, 1),
+        'Peak RSS MB': round(max(peak_rss, rss_after), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', nargs='+', default=list(synthetic.BUILDERS), choices=list(synthetic.BUILDERS))
+    parser.add_argument('--users', nargs='+', type=int, default=[1, 2, 4, 8])
+    parser.add_argument('--rows', type=int, default=1000, help='input rows per synthetic file')
+    parser.add_argument('--shared-file', action='store_true', help='every user uploads the same file')
+    parser.add_argument('--timeout', type=float, default=600, help='per-session script timeout in seconds')
+    parser.add_argument('--csv', help='also write the report to this CSV path')
+    args = parser.parse_args()
+
+    st.file_uploader = _fake_file_uploader
+    try:
+        report = [run_batch(page, users, args.rows, args.shared_file, args.timeout)
+                  for page in args.pages for users in args.users]
+    finally:
+        st.file_uploader = _real_file_uploader
+
+    columns = list(report[0])
+    widths = {col: max(len(col), *(len(str(row[col])) for row in report)) for col in columns}
+    print('  '.join(col.ljust(widths[col]) for col in columns))
+    for row in report:
+        print('  '.join(str(row[col]).ljust(widths[col]) for col in columns))
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(report)
+
+
+if __name__ == '__main__':
+    main()
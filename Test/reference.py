@@ -0,0 +1,290 @@
+"""Reference implementations for the differential harness.
+
+These are the extraction routines as they were before any optimisation,
+kept verbatim apart from dropping Streamlit calls and file paths:
+
+- notebook_* come from Test/company.ipynb and Test/Signal Priority Reports BF.ipynb.
+- page_* come from the original page scripts (per-row iterrows, per-cell .apply).
+
+Do not "fix" or speed these up; they are what the optimised paths are checked against.
+"""
+import ast
+import json
+from itertools import islice
+
+import pandas as pd
+
+
+# -------------------------- Notebooks -------------------------- #
+
+def notebook_company_bf(df):
+    """Test/company.ipynb: extract_priorities, then the Description join cell."""
+    extracted_data = []
+
+    for index, row in df.iterrows():
+        company = row['Company']
+        year = row['Year']
+        report_name = row['Report Name'].strip()
+        quarter = row['Quarter']
+        report_type = row['Report Type']
+        refreshed_date = row['Refreshed Date']
+
+        try:
+            priorities = json.loads(str(row['Formatted Priorities']))
+        except json.JSONDecodeError:
+            print(f"Warning: Invalid JSON for Company: {company}")
+            continue
+
+        for category, priority_list in priorities.items():
+            for priority in priority_list:
+                extracted_data.append({
+                    'Company': company,
+                    'Year': year,
+                    'Report Name': report_name,
+                    'Quarter': quarter,
+                    'Report Type': report_type,
+                    'Refreshed Date': refreshed_date,
+                    'Priority': priority.get('priority', 'N/A'),
+                    'Description': priority.get('description', 'N/A')
+                })
+
+    extracted_df = pd.DataFrame(extracted_data)
+    extracted_df['Description'] = extracted_df['Description'].apply(lambda x: ' '.join(x))
+    return extracted_df
+
+
+def notebook_signal_bf(df):
+    """Test/Signal Priority Reports BF.ipynb: extract_priorities, then the Description join cell."""
+    extracted_data = []
+
+    for index, row in df.iterrows():
+        company = row['Company']
+        publication_month = row['Publication Month']
+        months_considered = row['Months Considered']
+        highlights_month = row['Highlights Month']
+        priority_type = row['Priority Type']
+        try:
+            priorities = json.loads(str(row['Formatted Priorities']))
+        except json.JSONDecodeError:
+            print(f"Warning: Invalid JSON for Company: {company}")
+            continue
+        for category, priority_list in priorities.items():
+            for priority in priority_list:
+                extracted_data.append({
+                    'Company': company,
+                    'Publication Month': publication_month,
+                    'Months Considered': months_considered,
+                    'Highlights Month': highlights_month,
+                    'Priority Type': priority_type,
+                    'BF': category,
+                    'Priority': priority['priority'],
+                    'Description': priority['description']
+                })
+
+    extracted_df = pd.DataFrame(extracted_data)
+    extracted_df['Description'] = extracted_df['Description'].apply(lambda x: ' '.join(x))
+    return extracted_df
+
+
+# -------------------------- Pages -------------------------- #
+
+def _join_description(extracted_df):
+    if not extracted_df.empty:
+        extracted_df['Description'] = extracted_df['Description'].apply(lambda x: ' '.join(x) if isinstance(x, list) else x)
+    return extracted_df
+
+
+def page_company_bf(df):
+    """pages/Company BF.py: extract_priorities, then the Description join."""
+    extracted_data = []
+
+    for _, row in df.iterrows():
+        company = row.get('Company', 'Unknown')
+        year = row.get('Year', 'N/A')
+        report_name = row.get('Report Name', 'N/A')
+        quarter = row.get('Quarter', 'N/A')
+        report_type = row.get('Report Type', 'N/A')
+        refreshed_date = row.get('Refreshed Date', 'N/A')
+
+        try:
+            priorities = json.loads(str(row.get('Formatted Priorities', '{}')))
+        except json.JSONDecodeError:
+            continue
+
+        for category, priority_list in priorities.items():
+            for priority_item in priority_list:
+                extracted_data.append({
+                    'Company': company,
+                    'Year': year,
+                    'Report Name': report_name,
+                    'Quarter': quarter,
+                    'Report Type': report_type,
+                    'Refreshed Date': refreshed_date,
+                    'BF': category,
+                    'Priority': priority_item.get('priority', '-'),
+                    'Description': priority_item.get('description', '-'),
+                    'Recent Year Quater': priority_item.get('recent_year_quarter', '-'),
+                })
+
+    return _join_description(pd.DataFrame(extracted_data))
+
+
+def page_signal_bf(df):
+    """pages/Signal BF.py: extract_priorities, then the Description join."""
+    extracted_data = []
+
+    for _, row in df.iterrows():
+        company = row.get('Company', 'Unknown')
+        publication_month = row.get('Publication Month', 'N/A')
+        months_considered = row.get('Months Considered', 'N/A')
+        highlights_month = row.get('Highlights Month', 'N/A')
+        priority_type = row.get('Priority Type', 'N/A')
+
+        try:
+            priorities = json.loads(str(row.get('Formatted Priorities', '{}')))
+        except json.JSONDecodeError:
+            continue
+
+        for category, priority_list in priorities.items():
+            for priority in priority_list:
+                extracted_data.append({
+                    'Company': company,
+                    'Publication Month': publication_month,
+                    'Months Considered': months_considered,
+                    'Highlights Month': highlights_month,
+                    'Priority Type': priority_type,
+                    'BF': category,
+                    'Priority': priority.get('priority', '-'),
+                    'Description': priority.get('description', '-'),
+                    'Recent Year Month': priority.get('recent_year_month', '-')
+                })
+
+    return _join_description(pd.DataFrame(extracted_data))
+
+
+def page_bf_consolidated(df):
+    """pages/BF Consolidated.py: extract_priorities, then the Description join."""
+    extracted_data = []
+
+    for _, row in df.iterrows():
+        company = row.get('Company Name', 'Unknown')
+
+        try:
+            priorities = json.loads(str(row.get('Consolidated AI Response', '{}')))
+        except json.JSONDecodeError:
+            continue
+
+        for category, priority_list in priorities.items():
+            for priority_item in priority_list:
+                extracted_data.append({
+                    'Company': company,
+                    'BF': category,
+                    'Priority': priority_item.get('priority', '-'),
+                    'Description': priority_item.get('description', '-'),
+                    'source': priority_item.get('source', '-'),
+                    'recent_year_month': priority_item.get('recent_year_month', '-'),
+                    'recent_year_quarter': priority_item.get('recent_year_quarter', '-'),
+                })
+
+    return _join_description(pd.DataFrame(extracted_data))
+
+
+def page_consolidated_all(df):
+    """pages/Consolidated All.py: extract_priorities, which joins list descriptions inline."""
+    extracted_data = []
+
+    priority_columns = ['Transcript AI Response', 'Signal AI Response', 'Consolidated AI Response']
+
+    for _, row in df.iterrows():
+        company = row['Company Name']
+        generated = row['Generated On']
+        is_outdated = row['Is Outdated']
+        input_output_ratio = row['Input Output Ratio']
+
+        for col in priority_columns:
+            content = row.get(col, '{}')
+            if pd.isna(content) or str(content).strip() in ["", "nan", "None"]:
+                continue
+
+            try:
+                content_str = str(content)
+                try:
+                    priorities = json.loads(content_str)
+                except json.JSONDecodeError:
+                    priorities = ast.literal_eval(content_str)
+
+                if not isinstance(priorities, dict):
+                    raise ValueError("Parsed content is not a dictionary")
+
+                for category, priority_list in priorities.items():
+                    for priority in priority_list:
+                        description = priority.get('description', '-')
+                        if isinstance(description, list):
+                            description = ' '.join(description)
+
+                        extracted_data.append({
+                            'Company': company,
+                            'BF': category,
+                            'Priority': priority.get('priority', '-'),
+                            'Description': description,
+                            'source': priority.get('source', '-'),
+                            'recent_year_month': priority.get('recent_year_month', '-'),
+                            'recent_year_quarter': priority.get('recent_year_quarter', '-'),
+                            'AI Column Source': col,
+                            'Generated On': generated,
+                            'Is Outdated': is_outdated,
+                            'Input Output Ratio': input_output_ratio
+                        })
+
+            except Exception:
+                continue
+
+    return pd.DataFrame(extracted_data)
+
+
+def convert_binary_to_text(input_data):
+    """Cleans binary or escaped string input."""
+    if isinstance(input_data, bytes):
+        decoded = input_data.decode("utf-8", errors="ignore")
+        return decoded.replace("\\", "").replace("b'", "").replace("b\"", "").strip("\\'\"")
+    return input_data
+
+
+def parse_usecases(input_data):
+    """Parses dict or list of dicts with 'name' and 'score' from malformed strings (using ast)."""
+    try:
+        if isinstance(input_data, str):
+            cleaned = input_data.strip()
+            if cleaned.startswith("//"): cleaned = cleaned[2:]
+            if cleaned.endswith("//"): cleaned = cleaned[:-2]
+            input_data = ast.literal_eval(cleaned)
+
+        if isinstance(input_data, dict):
+            input_data = [{'name': k, 'score': v} for k, v in input_data.items()]
+
+        if isinstance(input_data, list) and all(isinstance(d, dict) and 'name' in d and 'score' in d for d in input_data):
+            sorted_items = sorted(input_data, key=lambda x: x['score'], reverse=True)
+            return "; ".join(item['name'] for item in islice(sorted_items, 3))
+    except Exception:
+        pass
+    return ""
+
+
+def page_aggregated(df):
+    """pages/Aggregated.py: steps 1-3."""
+    df['Description'] = df['Priority Description'].apply(
+        lambda x: convert_binary_to_text(x.encode('utf-8') if isinstance(x, str) else x)
+    )
+    df['Usecases'] = df['Usecase'].apply(parse_usecases)
+    df['Workload'] = df['Functional Workload'].apply(parse_usecases)
+
+    output_cols = [
+        'S.No.', 'Company', 'Business Function', 'Priority Name', 'Description',
+        'Usecases', 'Workload', 'Recent Year Month', 'Recent Year Quarter',
+        'Months Considered', 'Quarter Considered', 'Primary Vertical'
+    ]
+    for col in output_cols:
+        if col not in df.columns:
+            df[col] = '-'
+
+    return df[output_cols].fillna('-')
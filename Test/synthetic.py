@@ -0,0 +1,246 @@
+"""Synthetic upload files for the priority extraction pages.
+
+Each builder returns (file name, CSV bytes) shaped like the real exports the
+page expects, so harnesses can drive the pages without customer data. With
+`fuzz` > 0 that share of cells and priorities is corrupted the way hand-edited
+exports are: malformed JSON, Python-repr dicts, empty cells, missing keys,
+odd or list descriptions, and dates and quarters in other layouts, including
+whole date columns written as ambiguous dd/mm/yyyy or mm/dd/yyyy. Heavily
+fuzzed files (fuzz >= 0.5) also get unparseable dates and quarter labels.
+"""
+import csv
+import datetime
+import io
+import json
+import random
+
+BFS = ['Finance', 'Human Resources', 'Sales', 'Marketing', 'Operations', 'IT', 'Supply Chain', 'Legal']
+# Descriptions that trip up naive text cleaning
+FUZZ_TEXT = ['  padded  ', 'café – 10% growth', 'quoted "text" here', "it's", 'back\\slash', '', "b'bytes'", 'nan', '-']
+WORDS = ('modernise cloud platform reduce cost improve customer experience automate workflows expand '
+         'markets invest talent digital transformation analytics security compliance growth margin').split()
+
+
+# Fuzz rate from which dates and quarters may also be unparseable text
+GARBAGE_DATE_FUZZ = 0.5
+# Slash layouts a whole exported date column may use; which one cannot be told when every day is <= 12
+AMBIGUOUS_LAYOUTS = ['%m/%d/%Y', '%d/%m/%Y']
+
+
+def _date_variant(rng, year, month, day, fuzz):
+    """The same date in another layout an export might use, or a blank."""
+    date = datetime.date(year, month, day or 1)
+    variants = [date.strftime('%B %Y'), date.strftime('%b-%Y'), date.strftime('%m/%Y'), date.strftime('%Y/%m/%d'),
+                date.strftime('%Y-%m-%dT10:00:00Z'), date.strftime('%d %B %Y'), '', 'N/A']
+    variants.extend(date.strftime(layout) for layout in AMBIGUOUS_LAYOUTS)
+    if fuzz >= GARBAGE_DATE_FUZZ:
+        variants.append('TBD')
+    return rng.choice(variants)
+
+
+def _date_layout(rng, fuzz):
+    """For a `fuzz` share of date columns, an AMBIGUOUS_LAYOUTS entry the whole column is written in; else None."""
+    if fuzz and rng.random() < fuzz:
+        return rng.choice(AMBIGUOUS_LAYOUTS)
+    return None
+
+
+def _date_cell(rng, year, month, day=None, clock=None, fuzz=0.0, layout=None):
+    """'YYYY-MM' (or 'YYYY-MM-DD [clock]' with a day), the column's `layout`, or for a `fuzz` share of cells a variant layout."""
+    if fuzz and rng.random() < fuzz:
+        return _date_variant(rng, year, month, day, fuzz)
+    if layout:
+        return datetime.date(year, month, day or 1).strftime(layout)
+    text = f"{year}-{month:02d}" if day is None else f"{year}-{month:02d}-{day:02d}"
+    return f"{text} {clock}" if clock else text
+
+
+def _quarter_variant(rng, year, quarter, fuzz):
+    """The same quarter in another layout, a blank, or (heavily fuzzed) a label no quarter parser reads."""
+    variants = [f"Q{quarter}-{year}", f"{year}Q{quarter}", f"Q{quarter} {year}", f"{year}-Q{quarter}", '']
+    if fuzz >= GARBAGE_DATE_FUZZ:
+        variants.extend([f"FY{year % 100} Q{quarter}", f"H{(quarter + 1) // 2} {year}"])
+    return rng.choice(variants)
+
+
+def _quarter_cell(rng, year, quarter, fuzz=0.0):
+    """'YYYY Qn' or, for a `fuzz` share of cells, another quarter layout or a blank."""
+    if fuzz and rng.random() < fuzz:
+        return _quarter_variant(rng, year, quarter, fuzz)
+    return f"{year} Q{quarter}"
+
+
+def _sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _priorities(rng, period_key, extra=None):
+    priorities = {}
+    for bf in rng.sample(BFS, rng.randint(1, 4)):
+        items = []
+        for _ in range(rng.randint(1, 5)):
+            year = rng.choice([2023, 2024, 2025])
+            item = {
+                'priority': _sentence(rng, 4),
+                'description': _sentence(rng) if rng.random() < 0.7 else [_sentence(rng), _sentence(rng)],
+                period_key: f"{year}-{rng.randint(1, 12):02d}" if period_key.endswith('month') else f"{year} Q{rng.randint(1, 4)}",
+            }
+            item.update(extra or {})
+            items.append(item)
+        priorities[bf] = items
+    return priorities
+
+
+def _fuzz_period(rng, value, fuzz):
+    """Rewrites a 'YYYY-MM' or 'YYYY Qn' period in another layout."""
+    if 'Q' in value:
+        year, quarter = value.split(' Q')
+        return _quarter_variant(rng, int(year), int(quarter), fuzz)
+    year, month = value.split('-')
+    return _date_variant(rng, int(year), int(month), None, fuzz)
+
+
+def _fuzz_items(rng, priorities, fuzz):
+    """Drops a key, rewrites the period or mangles the description of a `fuzz` share of priorities, in place."""
+    if not fuzz:
+        return priorities
+    for items in priorities.values():
+        for item in items:
+            if rng.random() >= fuzz:
+                continue
+            roll = rng.random()
+            period_key = next((key for key in item if key.startswith('recent_year')), None)
+            if roll < 0.3:
+                item.pop(rng.choice(list(item)))
+            elif roll < 0.5 and period_key:
+                item[period_key] = _fuzz_period(rng, item[period_key], fuzz)
+            elif roll < 0.7:
+                item['description'] = rng.choice(FUZZ_TEXT)
+            else:
+                item['description'] = [rng.choice(FUZZ_TEXT), _sentence(rng)]
+    return priorities
+
+
+def _json_cell(rng, priorities, fuzz=0.0):
+    """Serialises priorities as JSON or, for a `fuzz` share of cells, as a malformed, Python-repr or empty cell."""
+    text = json.dumps(_fuzz_items(rng, priorities, fuzz))
+    if not fuzz or rng.random() >= fuzz:
+        return text
+    roll = rng.random()
+    if roll < 0.35:
+        return text[:rng.randint(1, len(text) - 1)]
+    if roll < 0.7:
+        return repr(priorities)
+    if roll < 0.85:
+        return ''
+    return 'None'
+
+
+def _fuzz_text(rng, text, fuzz, variants):
+    return rng.choice(variants) if fuzz and rng.random() < fuzz else text
+
+
+def _to_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+def _company(i):
+    return f"Company {i:05d}"
+
+
+def signal_bf(rows, seed=0, fuzz=0.0):
+    rng = random.Random(seed)
+    publication_layout, highlights_layout = _date_layout(rng, fuzz), _date_layout(rng, fuzz)
+    data = [{
+        'Company': _company(i),
+        'Publication Month': _date_cell(rng, 2025, rng.randint(1, 12), fuzz=fuzz, layout=publication_layout),
+        'Months Considered': 6,
+        'Highlights Month': _date_cell(rng, 2025, rng.randint(1, 12), fuzz=fuzz, layout=highlights_layout),
+        'Priority Type': rng.choice(['Signal', 'News', 'Job Post']),
+        'Formatted Priorities': _json_cell(rng, _priorities(rng, 'recent_year_month'), fuzz),
+    } for i in range(rows)]
+    return f"signal_bf_{seed}.csv", _to_csv(data)
+
+
+def company_bf(rows, seed=0, fuzz=0.0):
+    rng = random.Random(seed)
+    refreshed_layout = _date_layout(rng, fuzz)
+    data = [{
+        'Company': _company(i),
+        'Year': rng.choice([2024, 2025]),
+        'Report Name': rng.choice(['Annual Report', '10-K', 'Earnings Call']),
+        'Quarter': f"Q{rng.randint(1, 4)}",
+        'Report Type': rng.choice(['Annual', 'Quarterly']),
+        'Refreshed Date': _date_cell(rng, 2025, rng.randint(1, 12), rng.randint(1, 28), fuzz=fuzz, layout=refreshed_layout),
+        'Formatted Priorities': _json_cell(rng, _priorities(rng, 'recent_year_quarter'), fuzz),
+    } for i in range(rows)]
+    return f"company_bf_{seed}.csv", _to_csv(data)
+
+
+def bf_consolidated(rows, seed=0, fuzz=0.0):
+    rng = random.Random(seed)
+    data = [{
+        'Company Name': _company(i),
+        'Consolidated AI Response': _json_cell(rng, _priorities(rng, 'recent_year_month', {'source': 'Transcript'}), fuzz),
+    } for i in range(rows)]
+    return f"bf_consolidated_{seed}.csv", _to_csv(data)
+
+
+def consolidated_all(rows, seed=0, fuzz=0.0):
+    rng = random.Random(seed)
+    generated_layout = _date_layout(rng, fuzz)
+    data = []
+    for i in range(rows):
+        row = {
+            'Company Name': _company(i),
+            'Generated On': _date_cell(rng, 2025, rng.randint(1, 12), rng.randint(1, 28), '10:00:00', fuzz, generated_layout),
+            'Is Outdated': rng.random() < 0.2,
+            'Input Output Ratio': round(rng.random(), 3),
+        }
+        for col in ['Transcript AI Response', 'Signal AI Response', 'Consolidated AI Response']:
+            priorities = _priorities(rng, 'recent_year_quarter', {'source': col.split()[0]})
+            # Some exports carry Python-repr dicts instead of JSON
+            row[col] = repr(priorities) if rng.random() < 0.1 else _json_cell(rng, priorities, fuzz)
+        data.append(row)
+    return f"consolidated_all_{seed}.csv", _to_csv(data)
+
+
+def aggregated(rows, seed=0, fuzz=0.0):
+    rng = random.Random(seed)
+    month_layout = _date_layout(rng, fuzz)
+    data = []
+    for i in range(rows):
+        usecases = {_sentence(rng, 3): round(rng.random(), 2) for _ in range(rng.randint(1, 6))}
+        workloads = [{'name': _sentence(rng, 2), 'score': round(rng.random(), 2)} for _ in range(rng.randint(1, 6))]
+        data.append({
+            'S.No.': i + 1,
+            'Company': _company(i),
+            'Business Function': rng.choice(BFS),
+            'Priority Name': _sentence(rng, 4),
+            'Priority Description': _fuzz_text(rng, repr(_sentence(rng).encode('utf-8')), fuzz, [
+                'He said "hi"', 'back\\slash', '', repr('café'.encode('utf-8')), 'b"double"', "'quoted'"]),
+            'Usecase': _fuzz_text(rng, repr(usecases), fuzz, [
+                f"//{usecases!r}//", '{broken', json.dumps(workloads), "{'a': 1, 'b': 'x'}", '']),
+            'Functional Workload': _fuzz_text(rng, repr(workloads), fuzz, [
+                f"//{workloads!r}", '[{"name": "x"}]', json.dumps(usecases), 'None', '']),
+            'Recent Year Month': _date_cell(rng, 2025, rng.randint(1, 12), fuzz=fuzz, layout=month_layout),
+            'Recent Year Quarter': _quarter_cell(rng, 2025, rng.randint(1, 4), fuzz),
+            'Months Considered': 6,
+            'Quarter Considered': 2,
+            'Primary Vertical': rng.choice(['Banking', 'Retail', 'Healthcare']),
+        })
+    return f"aggregated_{seed}.csv", _to_csv(data)
+
+
+# Page script -> builder
+BUILDERS = {
+    'Signal BF': signal_bf,
+    'Company BF': company_bf,
+    'BF Consolidated': bf_consolidated,
+    'Consolidated All': consolidated_all,
+    'Aggregated': aggregated,
+}
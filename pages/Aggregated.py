@@ -1,8 +1,13 @@
 import streamlit as st
 import pandas as pd
-import ast
 from datetime import datetime
-from itertools import islice
+from utils.dates import parse_date_columns
+from utils.export import table_csv, table_excel
+from utils.extractors import AGGREGATED_COLUMNS, transform_aggregated
+from utils.store import RESULT_STORE, result_key
+from utils.widgets import admitted, confirm_full_run, partitioned_download, sheet_controls, show_rollups
+from utils.rollups import build_rollups
+from utils.uploads import CHUNK_ROWS, UPLOAD_TYPES, iter_upload, read_upload, spool_uploads
 
 # -------------------------- Streamlit Config -------------------------- #
 st.set_page_config(page_title="Aggregated Priority Extraction Tool", page_icon="📊", layout="wide")
@@ -11,42 +16,9 @@ st.info("Upload a priority mapping file (CSV or Excel) to extract and format top
 
 # -------------------------- Utility Functions -------------------------- #
 
-@st.cache_data
-def convert_binary_to_text(input_data):
-    """Cleans binary or escaped string input."""
-    if isinstance(input_data, bytes):
-        decoded = input_data.decode("utf-8", errors="ignore")
-        return decoded.replace("\\", "").replace("b'", "").replace("b\"", "").strip("\\'\"")
-    return input_data
-
-@st.cache_data
-def parse_usecases(input_data):
-    """Parses dict or list of dicts with 'name' and 'score' from malformed strings (using ast)."""
-    try:
-        if isinstance(input_data, str):
-            cleaned = input_data.strip()
-            if cleaned.startswith("//"): cleaned = cleaned[2:]
-            if cleaned.endswith("//"): cleaned = cleaned[:-2]
-            input_data = ast.literal_eval(cleaned)
-
-        if isinstance(input_data, dict):
-            input_data = [{'name': k, 'score': v} for k, v in input_data.items()]
-
-        if isinstance(input_data, list) and all(isinstance(d, dict) and 'name' in d and 'score' in d for d in input_data):
-            sorted_items = sorted(input_data, key=lambda x: x['score'], reverse=True)
-            return "; ".join(item['name'] for item in islice(sorted_items, 3))
-    except Exception:
-        pass
-    return ""
-
-@st.cache_data
-def read_file(uploaded_file):
-    """Reads CSV or Excel into DataFrame."""
-    if uploaded_file.name.endswith(".csv"):
-        return pd.read_csv(uploaded_file)
-    elif uploaded_file.name.endswith(".xlsx"):
-        return pd.read_excel(uploaded_file)
-    return pd.DataFrame()
+def read_file(upload, sheets=None, required_columns=None):
+    """Reads a spooled CSV, Excel or compressed upload (here the master schema) into DataFrame, every workbook sheet in parallel."""
+    return read_upload(upload, sheets, required_columns)
 
 def generate_filenames():
     timestamp = datetime.now().strftime("%Y_%m_%d_%H_%M")
@@ -57,69 +29,68 @@ def generate_filenames():
 
 # -------------------------- File Upload -------------------------- #
 
-uploaded_file = st.file_uploader("📁 Upload Aggregated Priority Mapping File", type=["csv", "xlsx"])
-master_file = st.file_uploader("📁 Upload Master Company Schema (Optional)", type=["csv", "xlsx"])
+uploaded_file = st.file_uploader("📁 Upload Aggregated Priority Mapping File", type=UPLOAD_TYPES)
+master_file = st.file_uploader("📁 Upload Master Company Schema (Optional)", type=UPLOAD_TYPES)
 
 # -------------------------- Processing Logic -------------------------- #
 
+def build_output(upload, master_upload, sheets=None, job=None):
+    """Runs steps 1-4 and returns the output frame for the result store."""
+    # Transform chunk by chunk so a compressed upload is never fully decompressed in memory.
+    # Each sheet is schema-checked on its own, so an error names the sheet at fault
+    chunk_rows = job.chunk_rows if job is not None else CHUNK_ROWS
+    frames = [transform_aggregated(chunk) for chunk in iter_upload(upload, chunk_rows, sheets=sheets, required_columns=AGGREGATED_COLUMNS)]
+    df_output = pd.concat(frames, ignore_index=True) if frames else transform_aggregated(pd.DataFrame(columns=AGGREGATED_COLUMNS))
+    # Dates are typed over the whole output, so every chunk agrees on each column's type
+    parse_date_columns(df_output)
+
+    # Step 4: Merge master company schema if provided
+    if master_upload:
+        master_df = read_file(master_upload)
+        if 'Company Name' in master_df.columns:
+            master_df = master_df.rename(columns={'Company Name': 'Company'})
+            df_output = df_output.merge(
+                master_df[['Company', 'Draup Verticals']],
+                on='Company',
+                how='left'
+            )
+    rollups = build_rollups(df_output, bf_col='Business Function', period_col='Recent Year Quarter')
+    return df_output, {'rollups': rollups}
+
 if uploaded_file:
     try:
-        df = read_file(uploaded_file)
-        required_columns = ['Priority Description', 'Usecase', 'Functional Workload', 'Company']
-        missing = [col for col in required_columns if col not in df.columns]
-
-        if missing:
-            st.error(f"Missing required columns: {', '.join(missing)}")
-        else:
-            # Step 1: Convert and clean text
-            df['Description'] = df['Priority Description'].apply(
-                lambda x: convert_binary_to_text(x.encode('utf-8') if isinstance(x, str) else x)
-            )
-            # Step 2: Parse usecases and workloads
-            df['Usecases'] = df['Usecase'].apply(parse_usecases)
-            df['Workload'] = df['Functional Workload'].apply(parse_usecases)
-
-            # Step 3: Define final columns
-            output_cols = [
-                'S.No.', 'Company', 'Business Function', 'Priority Name', 'Description',
-                'Usecases', 'Workload', 'Recent Year Month', 'Recent Year Quarter',
-                'Months Considered', 'Quarter Considered', 'Primary Vertical'
-            ]
-            for col in output_cols:
-                if col not in df.columns:
-                    df[col] = '-'
-
-            df_output = df[output_cols].fillna('-')
-
-            # Step 4: Merge master company schema if provided
-            if master_file:
-                master_df = read_file(master_file)
-                if 'Company Name' in master_df.columns:
-                    master_df = master_df.rename(columns={'Company Name': 'Company'})
-                    df_output = df_output.merge(
-                        master_df[['Company', 'Draup Verticals']],
-                        on='Company',
-                        how='left'
-                    )
+        # Spool uploads to disk once; results are shared across sessions and the session only keeps a handle
+        uploads = spool_uploads([f for f in (uploaded_file, master_file) if f], st.session_state.setdefault('spooled_uploads', {}))
+        upload, master_upload = uploads[0], (uploads[1] if master_file else None)
+        sheets = sheet_controls([upload])
+        key = result_key(f"aggregated:{sheets or ''}", uploads)
+        handle = st.session_state.get('extracted_result')
+        if handle is None or handle.key != key:
+            # Reuse a stored result if there is one; otherwise preview a sample before the full run
+            handle = RESULT_STORE.acquire(key)
+            if handle is None and confirm_full_run(key, [upload], transform_aggregated, ['Usecase', 'Functional Workload'], allow_python_repr=True):
+                handle = RESULT_STORE.get_or_create(key, admitted(key, [upload], lambda job: build_output(upload, master_upload, sheets, job)))
+            st.session_state['extracted_result'] = handle
+        if handle is not None:
+            output_table = handle.table
 
             # Step 5: Show and download output
             st.subheader("📌 Processed Data Preview")
-            st.dataframe(df_output, use_container_width=True)
+            st.dataframe(output_table, use_container_width=True)
 
             filename_csv, filename_excel = generate_filenames()
-            csv_data = df_output.to_csv(index=False).encode("utf-8")
-            df_output.to_excel(filename_excel, index=False, sheet_name="Priorities")
-
-            with open(filename_excel, "rb") as f:
-                excel_data = f.read()
 
+            # Files are only built when a download is clicked
             col1, col2 = st.columns(2)
             with col1:
-                st.download_button("⬇️ Download CSV", data=csv_data, file_name=filename_csv, mime="text/csv")
+                st.download_button("⬇️ Download CSV", data=lambda: table_csv(output_table), file_name=filename_csv,
+                                   mime="text/csv", on_click="ignore")
             with col2:
-                st.download_button("⬇️ Download Excel", data=excel_data, file_name=filename_excel,
-                                   mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                st.download_button("⬇️ Download Excel", data=lambda: table_excel(output_table, "Priorities"), file_name=filename_excel,
+                                   mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", on_click="ignore")
 
+            partitioned_download(output_table, filename_csv[:-len(".csv")])
+            show_rollups(handle.meta['rollups'], filename_csv[:-len(".csv")])
             st.success("✅ File processed and ready!")
 
     except Exception as e:
@@ -1,107 +1,98 @@
 import streamlit as st
 import pandas as pd
-import json
 from datetime import datetime
-import io
+from utils.dates import parse_date_columns
+from utils.export import table_csv, table_excel
+from utils.extractors import BF_CONSOLIDATED_COLUMNS, extract_bf_consolidated, missing_columns
+from utils.store import RESULT_STORE, result_key
+from utils.text import clean_text_columns
+from utils.widgets import admitted, confirm_full_run, partitioned_download, show_rollups
+from utils.rollups import build_rollups
+from utils.uploads import UPLOAD_TYPES, iter_upload, spool_uploads
 
 # Function to extract priorities
-@st.cache_data
-def extract_priorities(df):
-    extracted_data = []
+def extract_priorities(df, warn=True):
+    missing = missing_columns(df, BF_CONSOLIDATED_COLUMNS)
     
-    required_columns = ['Company Name', 'Consolidated AI Response']
-    missing_columns = [col for col in required_columns if col not in df.columns]
-    
-    if missing_columns:
-        st.error(f"❌ Missing columns in the uploaded file: {', '.join(missing_columns)}")
+    if missing:
+        st.error(f"❌ Missing columns in the uploaded file: {', '.join(missing)}")
         return pd.DataFrame()
     
-    for _, row in df.iterrows():
-        company = row.get('Company Name', 'Unknown')
-        
-        try:
-            priorities = json.loads(str(row.get('Consolidated AI Response', '{}')))
-        except json.JSONDecodeError:
+    extracted_df, invalid_companies = extract_bf_consolidated(df)
+    if warn:
+        for company in invalid_companies:
             st.warning(f"⚠️ Invalid JSON format for Company: {company}")
-            continue
-        
-        for category, priority_list in priorities.items():
-            for priority_item in priority_list:
-                extracted_data.append({
-                    'Company': company,
-                    'BF': category,
-                    'Priority': priority_item.get('priority', '-'),
-                    'Description': priority_item.get('description', '-'),
-                    'source': priority_item.get('source', '-'),
-                    'recent_year_month': priority_item.get('recent_year_month', '-'),
-                    'recent_year_quarter': priority_item.get('recent_year_quarter', '-'),
-                })
 
-    return pd.DataFrame(extracted_data)
+    return extracted_df
 
 # Streamlit App UI
 st.set_page_config(page_title="BF Consolidated Priority Extraction Tool", page_icon="🍳", layout="wide")
 st.title("🍳 BF Consolidated Priority Extraction Tool")   
 st.info("This tool helps extract and download priority Consolidated company business function from structured datasets. Upload a CSV or Excel file, process the data, and download the extracted priorities in a user-friendly format.")
 
-# Session state for storing extracted data
-if 'extracted_df' not in st.session_state:
-    st.session_state['extracted_df'] = pd.DataFrame()
-
 # File Upload
-uploaded_file = st.file_uploader("📂 Upload CSV or Excel file", type=['csv', 'xlsx'])
+uploaded_file = st.file_uploader("📂 Upload CSV, Excel or compressed (gz/zst/zip) file", type=UPLOAD_TYPES)
 
 if uploaded_file:
-    file_extension = uploaded_file.name.split(".")[-1]
+    def build_result(job):
+        # Never hold the whole decompressed input, only one chunk and the output
+        frames = [extract_priorities(chunk) for chunk in iter_upload(upload, job.chunk_rows)]
+        extracted_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if not extracted_df.empty:
+            clean_text_columns(extracted_df, ['Description'])
+            parse_date_columns(extracted_df)
+        return extracted_df, {'rollups': build_rollups(extracted_df, period_col='recent_year_quarter')}
     
     try:
-        df = pd.read_csv(uploaded_file) if file_extension == "csv" else pd.read_excel(uploaded_file)
+        # Process and Extract Data (shared across sessions; the session only keeps a handle)
+        upload, = spool_uploads([uploaded_file], st.session_state.setdefault('spooled_uploads', {}))
+        key = result_key('bf_consolidated', [upload])
+        handle = st.session_state.get('extracted_result')
         st.success("✅ File Uploaded Successfully!")
+        if handle is None or handle.key != key:
+            # Reuse a stored result if there is one; otherwise preview a sample before the full run
+            handle = RESULT_STORE.acquire(key)
+            preview_extract = lambda df: extract_priorities(df, warn=False)
+            if handle is None and confirm_full_run(key, [upload], preview_extract, ['Consolidated AI Response']):
+                handle = RESULT_STORE.get_or_create(key, admitted(key, [upload], build_result))
+            st.session_state['extracted_result'] = handle
+        if handle is not None:
+            extracted_table = handle.table
         
-        # Process and Extract Data
-        extracted_df = extract_priorities(df)
-        
-        if not extracted_df.empty:
-            extracted_df['Description'] = extracted_df['Description'].apply(lambda x: ' '.join(x) if isinstance(x, list) else x)
-            st.session_state['extracted_df'] = extracted_df
-            
-            # Display results
-            st.subheader("📌 Extracted Priorities Preview")
-            st.dataframe(extracted_df, use_container_width=True)
-            
-            # Generate dynamic filename
-            date_str = datetime.today().strftime("%Y_%m_%d_%H_%M")
-            output_filename_csv = f"Consolidated_extracted_priorities_{date_str}.csv"
-            output_filename_excel = f"Consolidated_extracted_priorities_{date_str}.xlsx"
-            
-            # Convert DataFrame to CSV for download
-            csv_data = extracted_df.to_csv(index=False).encode('utf-8')
+            if extracted_table.num_rows > 0:
+                # Display results
+                st.subheader("📌 Extracted Priorities Preview")
+                st.dataframe(extracted_table, use_container_width=True)
             
-            # Convert DataFrame to Excel for download
-            output_excel = io.BytesIO()
-            with pd.ExcelWriter(output_excel, engine='xlsxwriter') as writer:
-                extracted_df.to_excel(writer, index=False, sheet_name='Extracted Priorities')
-            output_excel.seek(0)
+                # Generate dynamic filename
+                date_str = datetime.today().strftime("%Y_%m_%d_%H_%M")
+                output_filename_csv = f"Consolidated_extracted_priorities_{date_str}.csv"
+                output_filename_excel = f"Consolidated_extracted_priorities_{date_str}.xlsx"
             
-            col1, col2 = st.columns(2)
-            with col1:
-                st.download_button(
-                    label="📥 Download as CSV",
-                    data=csv_data,
-                    file_name=output_filename_csv,
-                    mime="text/csv"
-                )
-            with col2:
-                st.download_button(
-                    label="📥 Download as Excel",
-                    data=output_excel,
-                    file_name=output_filename_excel,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+                # Files are only built when a download is clicked
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button(
+                        label="📥 Download as CSV",
+                        data=lambda: table_csv(extracted_table),
+                        file_name=output_filename_csv,
+                        mime="text/csv",
+                        on_click="ignore"
+                    )
+                with col2:
+                    st.download_button(
+                        label="📥 Download as Excel",
+                        data=lambda: table_excel(extracted_table),
+                        file_name=output_filename_excel,
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        on_click="ignore"
+                    )
             
-            st.success("✅ Processed file successfully!")        
-        else:
-            st.warning("⚠️ No priorities extracted. Please check your file format.")
+                partitioned_download(extracted_table, f"Consolidated_extracted_priorities_{date_str}")
+                show_rollups(handle.meta['rollups'], f"Consolidated_extracted_priorities_{date_str}")
+                st.success("✅ Processed file successfully!")        
+            else:
+                st.warning("⚠️ No priorities extracted. Please check your file format.")
     except Exception as e:
         st.error(f"❌ An error occurred: {e}")
 else:
@@ -1,115 +1,101 @@
 import streamlit as st
-import pandas as pd
-import json
 from datetime import datetime
-import io
+from utils.dates import parse_date_columns
+from utils.export import table_csv, table_excel
+from utils.filters import apply_row_filters, filters_key
+from utils.extractors import COMPANY_BF_COLUMNS, extract_company_bf
+from utils.ingest import ingest_files
+from utils.store import RESULT_STORE, result_key
+from utils.text import clean_text_columns
+from utils.widgets import admitted, confirm_full_run, filter_controls, partitioned_download, sheet_controls, show_rollups
+from utils.rollups import build_rollups
+from utils.uploads import CHUNK_ROWS, UPLOAD_TYPES, spool_uploads
 
-# Function to extract priorities
-@st.cache_data
-def extract_priorities(df):
-    extracted_data = []
-    
-    required_columns = ['Company', 'Year', 'Report Name', 'Quarter', 'Report Type', 'Refreshed Date', 'Formatted Priorities']
-    missing_columns = [col for col in required_columns if col not in df.columns]
-    
-    if missing_columns:
-        st.error(f"❌ Missing columns in the uploaded file: {', '.join(missing_columns)}")
-        return pd.DataFrame()
-    
-    for _, row in df.iterrows():
-        company = row.get('Company', 'Unknown')
-        year = row.get('Year', 'N/A')
-        report_name = row.get('Report Name', 'N/A')
-        quarter = row.get('Quarter', 'N/A')
-        report_type = row.get('Report Type', 'N/A')
-        refreshed_date = row.get('Refreshed Date', 'N/A')
-        
-        try:
-            priorities = json.loads(str(row.get('Formatted Priorities', '{}')))
-        except json.JSONDecodeError:
-            st.warning(f"⚠️ Invalid JSON format for Company: {company}")
-            continue
-        
-        for category, priority_list in priorities.items():
-            for priority_item in priority_list:
-                extracted_data.append({
-                    'Company': company,
-                    'Year': year,
-                    'Report Name': report_name,
-                    'Quarter': quarter,
-                    'Report Type': report_type,
-                    'Refreshed Date': refreshed_date,
-                    'BF': category,
-                    'Priority': priority_item.get('priority', '-'),
-                    'Description': priority_item.get('description', '-'),
-                    'Recent Year Quater': priority_item.get('recent_year_quarter', '-'),
-                })
-    
-    return pd.DataFrame(extracted_data)
+# Function to extract priorities from one or more uploaded files
+def extract_priorities(uploads, filters, sheets=None, max_workers=None, chunksize=CHUNK_ROWS):
+    files = [(upload.name, upload.path) for upload in uploads]
+    extracted_df, file_report = ingest_files(files, extract_company_bf, COMPANY_BF_COLUMNS, filters, max_workers, sheets, chunksize)
+    if not extracted_df.empty:
+        clean_text_columns(extracted_df, ['Description'])
+        parse_date_columns(extracted_df)
+    rollups = build_rollups(extracted_df, period_col='Recent Year Quater')
+    return extracted_df, {'file_report': file_report, 'rollups': rollups}
 
 # Streamlit App UI
 st.set_page_config(page_title="Company BF Priority Extraction Tool", page_icon="🍳", layout="wide")
 st.title("🍳 Company BF Priority Extraction Tool")   
 st.info("This tool helps extract and download priority company business function from structured datasets. Upload a CSV or Excel file, process the data, and download the extracted priorities in a user-friendly format.")
 
-# Session state for storing extracted data
-if 'extracted_df' not in st.session_state:
-    st.session_state['extracted_df'] = pd.DataFrame()
-
 # File Upload
-uploaded_file = st.file_uploader("📂 Upload CSV or Excel file", type=['csv', 'xlsx'])
+uploaded_files = st.file_uploader("📂 Upload CSV, Excel or compressed (gz/zst/zip) files", type=UPLOAD_TYPES, accept_multiple_files=True)
 
-if uploaded_file:
-    file_extension = uploaded_file.name.split(".")[-1]
-    
+if uploaded_files:
     try:
-        df = pd.read_csv(uploaded_file) if file_extension == "csv" else pd.read_excel(uploaded_file)
-        st.success("✅ File Uploaded Successfully!")
+        # Spool uploads to disk once; extraction reads them back memory-mapped
+        uploads = spool_uploads(uploaded_files, st.session_state.setdefault('spooled_uploads', {}))
+        st.success(f"✅ {len(uploads)} File(s) Uploaded Successfully!")
         
-        # Process and Extract Data
-        extracted_df = extract_priorities(df)
+        # Every sheet of a multi-sheet workbook is extracted unless narrowed down here
+        sheets = sheet_controls(uploads)
         
-        if not extracted_df.empty:
-            extracted_df['Description'] = extracted_df['Description'].apply(lambda x: ' '.join(x) if isinstance(x, list) else x)
-            st.session_state['extracted_df'] = extracted_df
-            
-            # Display results
-            st.subheader("📌 Extracted Priorities Preview")
-            st.dataframe(extracted_df, use_container_width=True)
-            
-            # Generate dynamic filename
-            date_str = datetime.today().strftime("%Y_%m_%d_%H_%M")
-            output_filename_csv = f"company_extracted_priorities_{date_str}.csv"
-            output_filename_excel = f"company_extracted_priorities_{date_str}.xlsx"
-            
-            # Convert DataFrame to CSV for download
-            csv_data = extracted_df.to_csv(index=False).encode('utf-8')
+        # Filters run on raw rows inside the workers, before any JSON is decoded
+        filters = filter_controls(uploads, ['Company', 'Report Type'], date_col='Refreshed Date')
+        
+        # Process and Extract Data (shared across sessions; the session only keeps a handle)
+        key = result_key(f"company_bf:{filters_key(filters)}:{sheets or ''}", uploads)
+        handle = st.session_state.get('extracted_result')
+        if handle is None or handle.key != key:
+            # Reuse a stored result if there is one; otherwise preview a sample before the full run
+            handle = RESULT_STORE.acquire(key)
+            preview_extract = lambda df: extract_company_bf(apply_row_filters(df, filters))[0]
+            if handle is None and confirm_full_run(key, uploads, preview_extract, ['Formatted Priorities']):
+                handle = RESULT_STORE.get_or_create(key, admitted(key, uploads, lambda job: extract_priorities(uploads, filters, sheets, job.max_workers, job.chunk_rows)))
+            st.session_state['extracted_result'] = handle
+        if handle is not None:
+            extracted_table, file_report = handle.table, handle.meta['file_report']
+        
+            st.subheader("🗂️ File Processing Report")
+            st.dataframe(file_report, use_container_width=True)
+            failed_files = file_report[file_report['Error'] != '']
+            if not failed_files.empty:
+                st.error(f"❌ {len(failed_files)} file(s) could not be processed. See the report above.")
+            if file_report['Invalid JSON Rows'].sum() > 0:
+                st.warning(f"⚠️ Skipped {file_report['Invalid JSON Rows'].sum()} row(s) with invalid JSON format.")
+        
+            if extracted_table.num_rows > 0:
+                # Display results
+                st.subheader("📌 Extracted Priorities Preview")
+                st.dataframe(extracted_table, use_container_width=True)
             
-            # Convert DataFrame to Excel for download
-            output_excel = io.BytesIO()
-            with pd.ExcelWriter(output_excel, engine='xlsxwriter') as writer:
-                extracted_df.to_excel(writer, index=False, sheet_name='Extracted Priorities')
-            output_excel.seek(0)
+                # Generate dynamic filename
+                date_str = datetime.today().strftime("%Y_%m_%d_%H_%M")
+                output_filename_csv = f"company_extracted_priorities_{date_str}.csv"
+                output_filename_excel = f"company_extracted_priorities_{date_str}.xlsx"
             
-            col1, col2 = st.columns(2)
-            with col1:
-                st.download_button(
-                    label="📥 Download as CSV",
-                    data=csv_data,
-                    file_name=output_filename_csv,
-                    mime="text/csv"
-                )
-            with col2:
-                st.download_button(
-                    label="📥 Download as Excel",
-                    data=output_excel,
-                    file_name=output_filename_excel,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+                # Files are only built when a download is clicked
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button(
+                        label="📥 Download as CSV",
+                        data=lambda: table_csv(extracted_table),
+                        file_name=output_filename_csv,
+                        mime="text/csv",
+                        on_click="ignore"
+                    )
+                with col2:
+                    st.download_button(
+                        label="📥 Download as Excel",
+                        data=lambda: table_excel(extracted_table),
+                        file_name=output_filename_excel,
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        on_click="ignore"
+                    )
             
-            st.success("✅ Processed file successfully!")        
-        else:
-            st.warning("⚠️ No priorities extracted. Please check your file format.")
+                partitioned_download(extracted_table, f"company_extracted_priorities_{date_str}")
+                show_rollups(handle.meta['rollups'], f"company_extracted_priorities_{date_str}")
+                st.success("✅ Processed file successfully!")        
+            else:
+                st.warning("⚠️ No priorities extracted. Please check your file format.")
     except Exception as e:
         st.error(f"❌ An error occurred: {e}")
 else:
@@ -1,9 +1,14 @@
 import streamlit as st
 import pandas as pd
-import json
-import ast
 from datetime import datetime
-import io
+from utils.extractors import PRIORITY_COLUMNS, extract_consolidated_all
+from utils.rollups import build_rollups
+from utils.uploads import UPLOAD_TYPES, iter_upload, spool_uploads
+from utils.dates import parse_date_columns
+from utils.export import table_csv, table_excel
+from utils.filters import apply_row_filters, filters_key
+from utils.store import RESULT_STORE, filter_table, latest_rows, result_key
+from utils.widgets import admitted, confirm_full_run, filter_controls, partitioned_download, show_rollups
 
 # ------------------------ Streamlit Page Config ------------------------
 st.set_page_config(page_title="BF Consolidated Priority All Extraction Tool", page_icon="🍳", layout="wide")
@@ -11,75 +16,11 @@ st.title("🍳 BF Consolidated All Priority Extraction Tool")
 st.info("This tool extracts and downloads company business function priorities from structured datasets. Upload a CSV or Excel file, process the data, and download the extracted priorities.")
 
 # ------------------------ Priority Extraction Function ------------------------
-@st.cache_data
-def extract_priorities(df):
-    extracted_data = []
-
-    required_columns = [
-        'Company Name', 'Generated On', 'Is Outdated',
-        'Input Output Ratio', 'Transcript AI Response',
-        'Signal AI Response', 'Consolidated AI Response'
-    ]
-
-    for col in required_columns:
-        if col not in df.columns:
-            raise ValueError(f"Missing required column: {col}")
-
-    priority_columns = ['Transcript AI Response', 'Signal AI Response', 'Consolidated AI Response']
-
-    for _, row in df.iterrows():
-        company = row['Company Name']
-        generated = row['Generated On']
-        is_outdated = row['Is Outdated']
-        input_output_ratio = row['Input Output Ratio']
-
-        for col in priority_columns:
-            content = row.get(col, '{}')
-            if pd.isna(content) or str(content).strip() in ["", "nan", "None"]:
-                continue
-
-            try:
-                content_str = str(content)
-                try:
-                    priorities = json.loads(content_str)
-                except json.JSONDecodeError:
-                    priorities = ast.literal_eval(content_str)
-
-                if not isinstance(priorities, dict):
-                    raise ValueError("Parsed content is not a dictionary")
-
-                for category, priority_list in priorities.items():
-                    for priority in priority_list:
-                        description = priority.get('description', '-')
-                        if isinstance(description, list):
-                            description = ' '.join(description)
-
-                        extracted_data.append({
-                            'Company': company,
-                            'BF': category,
-                            'Priority': priority.get('priority', '-'),
-                            'Description': description,
-                            'source': priority.get('source', '-'),
-                            'recent_year_month': priority.get('recent_year_month', '-'),
-                            'recent_year_quarter': priority.get('recent_year_quarter', '-'),
-                            'AI Column Source': col,
-                            'Generated On': generated,
-                            'Is Outdated': is_outdated,
-                            'Input Output Ratio': input_output_ratio
-                        })
-
-            except Exception as e:
-                print(f"⚠️ Error processing {col} for {company}: {e}")
-                continue
-
-    return pd.DataFrame(extracted_data)
-
-# ------------------------ Session State Initialization ------------------------
-if 'extracted_df' not in st.session_state:
-    st.session_state['extracted_df'] = pd.DataFrame()
+def extract_priorities(df, priority_columns=PRIORITY_COLUMNS):
+    return extract_consolidated_all(df, priority_columns)[0]
 
 # ------------------------ File Upload Section ------------------------
-uploaded_file = st.file_uploader("📂 Upload CSV or Excel file", type=['csv', 'xlsx'])
+uploaded_file = st.file_uploader("📂 Upload CSV, Excel or compressed (gz/zst/zip) file", type=UPLOAD_TYPES)
 
 with st.expander("💡 Sample Format & Troubleshooting Tips"):
     st.markdown("""
@@ -93,58 +34,75 @@ with st.expander("💡 Sample Format & Troubleshooting Tips"):
 # ------------------------ File Processing ------------------------
 if uploaded_file:
     try:
-        ext = uploaded_file.name.split('.')[-1].lower()
-        df = pd.read_csv(uploaded_file) if ext == 'csv' else pd.read_excel(uploaded_file)
-
+        upload, = spool_uploads([uploaded_file], st.session_state.setdefault('spooled_uploads', {}))
+
+        # ------------------------ Pre-extraction Filters ------------------------
+        source_columns = st.multiselect("🧩 AI response columns to decode", PRIORITY_COLUMNS, default=PRIORITY_COLUMNS)
+        filters = filter_controls([upload], ['Company Name'], date_col='Generated On', outdated_col='Is Outdated')
+
+        def build_result(job):
+            # Decode chunk by chunk so a compressed export is never fully decompressed in memory,
+            # dropping filtered-out rows before any JSON is parsed
+            frames = [extract_priorities(apply_row_filters(chunk, filters), source_columns) for chunk in iter_upload(upload, job.chunk_rows)]
+            extracted_df = parse_date_columns(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame())
+            return extracted_df, {'rollups': build_rollups(extracted_df, period_col='recent_year_quarter')}
+
+        # Results are shared across sessions; the session only keeps a handle
+        key = result_key(f"consolidated_all:{filters_key(filters)}:{','.join(source_columns)}", [upload])
+        handle = st.session_state.get('extracted_result')
         st.success("✅ File uploaded successfully!")
-
-        extracted_df = extract_priorities(df)
-
-        if not extracted_df.empty:
-            st.session_state['extracted_df'] = extracted_df.copy()
-
-            # ------------------------ Filter/Search Section ------------------------
-            st.subheader("🔍 Search & Display Options")
-            search_term = st.text_input("Search by Company, Priority, or Description")
-
-            display_df = extracted_df.copy()
-            if search_term:
-                display_df = display_df[display_df.apply(lambda row: search_term.lower() in str(row).lower(), axis=1)]
-
-            selected_columns = st.multiselect(
-                "🧾 Select columns to display & download",
-                options=display_df.columns.tolist(),
-                default=display_df.columns.tolist()
-            )
-
-            final_display_df = display_df[selected_columns]
-
-            # ------------------------ Display Table ------------------------
-            st.subheader("📌 Extracted Priorities Preview")
-            st.dataframe(final_display_df, use_container_width=True)
-
-            # ------------------------ Download Section ------------------------
-            date_str = datetime.now().strftime("%Y_%m_%d_%H_%M")
-            filename_csv = f"Consolidated_extracted_priorities_{date_str}.csv"
-            filename_excel = f"Consolidated_extracted_priorities_{date_str}.xlsx"
-
-            csv_data = final_display_df.to_csv(index=False).encode('utf-8')
-            excel_io = io.BytesIO()
-            with pd.ExcelWriter(excel_io, engine='xlsxwriter') as writer:
-                final_display_df.to_excel(writer, sheet_name='Extracted Priorities', index=False)
-            excel_io.seek(0)
-
-            col1, col2 = st.columns(2)
-            with col1:
-                st.download_button("📥 Download as CSV", data=csv_data, file_name=filename_csv, mime="text/csv")
-            with col2:
-                st.download_button("📥 Download as Excel", data=excel_io, file_name=filename_excel,
-                                   mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-
-            st.success("✅ Processed and ready for download!")
-
-        else:
-            st.warning("⚠️ No priorities were extracted. Please check the input data format.")
+        if handle is None or handle.key != key:
+            # Reuse a stored result if there is one; otherwise preview a sample before the full run
+            handle = RESULT_STORE.acquire(key)
+            preview_extract = lambda df: extract_priorities(apply_row_filters(df, filters), source_columns)
+            if handle is None and confirm_full_run(key, [upload], preview_extract, source_columns, allow_python_repr=True):
+                handle = RESULT_STORE.get_or_create(key, admitted(key, [upload], build_result))
+            st.session_state['extracted_result'] = handle
+        if handle is not None:
+            extracted_table = handle.table
+
+
+            if extracted_table.num_rows > 0:
+                # ------------------------ Filter/Search Section ------------------------
+                st.subheader("🔍 Search & Display Options")
+                search_term = st.text_input("Search by Company, Priority, or Description")
+
+                selected_columns = st.multiselect(
+                    "🧾 Select columns to display & download",
+                    options=extracted_table.column_names,
+                    default=extracted_table.column_names
+                )
+
+                latest_only = st.checkbox("🕒 Keep only each company's latest 'Generated On'")
+
+                # Filtering and column selection work on views of the shared table
+                display_table = latest_rows(extracted_table, 'Company', 'Generated On') if latest_only else extracted_table
+                final_display_table = filter_table(display_table, search_term, selected_columns)
+
+                # ------------------------ Display Table ------------------------
+                st.subheader("📌 Extracted Priorities Preview")
+                st.dataframe(final_display_table, use_container_width=True)
+
+                # ------------------------ Download Section ------------------------
+                date_str = datetime.now().strftime("%Y_%m_%d_%H_%M")
+                filename_csv = f"Consolidated_extracted_priorities_{date_str}.csv"
+                filename_excel = f"Consolidated_extracted_priorities_{date_str}.xlsx"
+
+                # Files are only built when a download is clicked
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button("📥 Download as CSV", data=lambda: table_csv(final_display_table), file_name=filename_csv,
+                                       mime="text/csv", on_click="ignore")
+                with col2:
+                    st.download_button("📥 Download as Excel", data=lambda: table_excel(final_display_table), file_name=filename_excel,
+                                       mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", on_click="ignore")
+
+                partitioned_download(final_display_table, f"Consolidated_extracted_priorities_{date_str}")
+                show_rollups(handle.meta['rollups'], f"Consolidated_extracted_priorities_{date_str}")
+                st.success("✅ Processed and ready for download!")
+
+            else:
+                st.warning("⚠️ No priorities were extracted. Please check the input data format.")
 
     except Exception as e:
         st.error(f"❌ An error occurred: {e}")
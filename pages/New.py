@@ -1,8 +1,11 @@
 import streamlit as st
-import pandas as pd
 import ast
 from datetime import datetime
 from itertools import islice
+from utils.text import unescape_binary_text
+from utils.widgets import show_rollups
+from utils.rollups import build_rollups
+from utils.uploads import UPLOAD_TYPES, read_upload, spool_uploads
 
 # -------------------------- Streamlit Config -------------------------- #
 st.set_page_config(page_title="Aggregated Priority Extraction Tool", page_icon="📊", layout="wide")
@@ -11,14 +14,6 @@ st.info("Upload a priority mapping file (CSV or Excel) to extract and format top
 
 # -------------------------- Utility Functions -------------------------- #
 
-@st.cache_data
-def convert_binary_to_text(input_data):
-    """Cleans binary or escaped string input."""
-    if isinstance(input_data, bytes):
-        decoded = input_data.decode("utf-8", errors="ignore")
-        return decoded.replace("\\", "").replace("b'", "").replace("b\"", "").strip("\\'\"")
-    return input_data
-
 @st.cache_data
 def parse_usecases(input_data):
     """Parses dict or list of dicts with 'name' and 'score' from malformed strings (using ast)."""
@@ -39,14 +34,9 @@ def parse_usecases(input_data):
         pass
     return ""
 
-@st.cache_data
-def read_file(uploaded_file):
-    """Reads CSV or Excel into DataFrame."""
-    if uploaded_file.name.endswith(".csv"):
-        return pd.read_csv(uploaded_file)
-    elif uploaded_file.name.endswith(".xlsx"):
-        return pd.read_excel(uploaded_file)
-    return pd.DataFrame()
+def read_file(upload):
+    """Reads a spooled CSV, Excel or compressed upload into DataFrame."""
+    return read_upload(upload)
 
 def generate_filenames():
     timestamp = datetime.now().strftime("%Y_%m_%d_%H_%M")
@@ -57,14 +47,16 @@ def generate_filenames():
 
 # -------------------------- File Upload -------------------------- #
 
-uploaded_file = st.file_uploader("📁 Upload Aggregated Priority Mapping File", type=["csv", "xlsx"])
-master_file = st.file_uploader("📁 Upload Master Company Schema (Optional)", type=["csv", "xlsx"])
+uploaded_file = st.file_uploader("📁 Upload Aggregated Priority Mapping File", type=UPLOAD_TYPES)
+master_file = st.file_uploader("📁 Upload Master Company Schema (Optional)", type=UPLOAD_TYPES)
 
 # -------------------------- Processing Logic -------------------------- #
 
 if uploaded_file:
     try:
-        df = read_file(uploaded_file)
+        # Spool uploads to disk once, not on every rerun
+        uploads = spool_uploads([f for f in (uploaded_file, master_file) if f], st.session_state.setdefault('spooled_uploads', {}))
+        df = read_file(uploads[0])
         required_columns = ['Priority Description', 'Usecase', 'Functional Workload', 'Company']
         missing = [col for col in required_columns if col not in df.columns]
 
@@ -72,9 +64,7 @@ if uploaded_file:
             st.error(f"Missing required columns: {', '.join(missing)}")
         else:
             # Step 1: Convert and clean text
-            df['Description'] = df['Priority Description'].apply(
-                lambda x: convert_binary_to_text(x.encode('utf-8') if isinstance(x, str) else x)
-            )
+            df['Description'] = unescape_binary_text(df['Priority Description'])
             # Step 2: Parse usecases and workloads
             df['Usecases'] = df['Usecase'].apply(parse_usecases)
             df['Workload'] = df['Functional Workload'].apply(parse_usecases)
@@ -93,7 +83,7 @@ if uploaded_file:
 
             # Step 4: Merge master company schema if provided
             if master_file:
-                master_df = read_file(master_file)
+                master_df = read_file(uploads[1])
                 if 'Company Name' in master_df.columns:
                     master_df = master_df.rename(columns={'Company Name': 'Company'})
                     df_output = df_output.merge(
@@ -120,6 +110,8 @@ if uploaded_file:
                 st.download_button("⬇️ Download Excel", data=excel_data, file_name=filename_excel,
                                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
 
+            rollups = build_rollups(df_output, bf_col='Business Function', period_col='Recent Year Quarter')
+            show_rollups(rollups, filename_csv[:-len(".csv")])
             st.success("✅ File processed and ready!")
 
     except Exception as e:
@@ -0,0 +1,141 @@
+import streamlit as st
+from utils.uploads import UPLOAD_TYPES, read_upload, spool_uploads
+from utils.similarity import SimilarityIndex, company_overlap, matches_frame
+
+# ------------------------ Streamlit Page Config ------------------------
+st.set_page_config(page_title="Priority Similarity Search", page_icon="🍳", layout="wide")
+st.title("🍳 Priority Similarity Search")
+st.info("Find similar priorities and companies across an extracted dataset. Use the result extracted on another page, or upload an extracted CSV or Excel file.")
+
+# Candidate names per role, in the order the extraction pages emit them
+COMPANY_COLUMNS = ['Company', 'Company Name']
+BF_COLUMNS = ['BF', 'Business Function']
+PRIORITY_COLUMNS = ['Priority', 'Priority Name']
+TEXT_COLUMN = 'Description'
+
+
+def pick_column(columns, candidates):
+    return next((c for c in candidates if c in columns), None)
+
+
+# ------------------------ Index Building ------------------------
+@st.cache_resource(show_spinner="Loading priorities...", max_entries=4)
+def load_frame(key, _load):
+    """One read-only DataFrame per result key or upload digest, so reruns do not convert or re-read it."""
+    return _load().reset_index(drop=True)
+
+
+@st.cache_resource(show_spinner="Building similarity index...", max_entries=4)
+def build_index(key, _df, text_columns):
+    """One TF-IDF index per result key, shared across sessions."""
+    texts = _df[text_columns[0]].fillna('').astype(str)
+    for col in text_columns[1:]:
+        texts = texts + ' ' + _df[col].fillna('').astype(str)
+    return SimilarityIndex(texts)
+
+
+# Every tab runs on every rerun, so the heavy queries are cached per result key
+@st.cache_data(max_entries=64)
+def row_neighbours(key, _index, row, top_k):
+    indices, scores = _index.neighbours([row], k=top_k)
+    return indices[0], scores[0]
+
+
+@st.cache_data(show_spinner="Clustering...", max_entries=16)
+def cluster_bf(key, _index, bf, _rows, n_clusters):
+    """Clusters one BF's rows; `_rows` is derived from (key, bf), so it is left out of the cache key."""
+    return _index.cluster(_rows, n_clusters=n_clusters)
+
+
+def show_matches(df, indices, scores, company_col):
+    matches = matches_frame(df, indices, scores)
+    if matches.empty:
+        st.warning("⚠️ No similar priorities found.")
+        return
+    st.subheader("🔎 Similar Priorities")
+    st.dataframe(matches, use_container_width=True)
+    if company_col:
+        st.subheader("🏢 Similar Companies")
+        st.dataframe(company_overlap(matches, company_col), use_container_width=True)
+
+
+# ------------------------ Streamlit UI ------------------------
+source = st.radio("Data source", ["Current extraction", "Upload extracted file"], horizontal=True)
+
+df, key = None, None
+if source == "Current extraction":
+    handle = st.session_state.get('extracted_result')
+    if handle is None:
+        st.warning("⚠️ No extraction in this session yet. Run one of the extraction pages first, or upload an extracted file.")
+    else:
+        df, key = load_frame(handle.key, handle.table.to_pandas), handle.key
+else:
+    uploaded_file = st.file_uploader("📂 Upload extracted priorities", type=UPLOAD_TYPES)
+    if uploaded_file is not None:
+        try:
+            upload, = spool_uploads([uploaded_file], st.session_state.setdefault('similarity_uploads', {}))
+            key = f"upload:{upload.digest}"
+            df = load_frame(key, lambda: read_upload(upload))
+        except Exception as e:
+            st.error(f"❌ Error reading file: {e}")
+
+if df is not None:
+    if TEXT_COLUMN not in df.columns:
+        st.error(f"❌ Missing required column: {TEXT_COLUMN}")
+        st.stop()
+
+    company_col = pick_column(df.columns, COMPANY_COLUMNS)
+    bf_col = pick_column(df.columns, BF_COLUMNS)
+    priority_col = pick_column(df.columns, PRIORITY_COLUMNS)
+    text_columns = tuple(c for c in [priority_col, TEXT_COLUMN] if c)
+
+    try:
+        index = build_index(key, df, text_columns)
+    except ValueError as e:
+        st.error(f"❌ Could not build the similarity index: {e}")
+        st.stop()
+    st.success(f"✅ Indexed {len(index):,} priorities.")
+
+    top_k = st.slider("Results per query", min_value=5, max_value=100, value=10, step=5)
+    query_tab, row_tab, cluster_tab = st.tabs(["Search by Text", "Search by Row", "Cluster within BF"])
+
+    with query_tab:
+        query = st.text_input("Describe a priority")
+        if query.strip():
+            indices, scores = index.search([query], k=top_k)
+            show_matches(df, indices[0], scores[0], company_col)
+
+    with row_tab:
+        row = st.number_input("Row number", min_value=0, max_value=len(df) - 1, value=0, step=1)
+        st.dataframe(df.iloc[[row]], use_container_width=True)
+        indices, scores = row_neighbours(key, index, int(row), top_k)
+        show_matches(df, indices, scores, company_col)
+
+    with cluster_tab:
+        if bf_col is None:
+            st.warning(f"⚠️ No business function column found (expected one of {', '.join(BF_COLUMNS)}).")
+        else:
+            bf = st.selectbox("Business Function", sorted(df[bf_col].dropna().astype(str).unique()))
+            n_clusters = st.slider("Clusters", min_value=2, max_value=30, value=8)
+            rows = df.index[df[bf_col].astype(str) == bf].to_numpy()
+            if len(rows) < 2:
+                st.warning("⚠️ Not enough priorities in this BF to cluster.")
+            else:
+                labels, terms = cluster_bf(key, index, bf, rows, n_clusters)
+                clustered = df.iloc[rows].copy()
+                clustered.insert(0, 'Cluster', labels)
+                summary = clustered.groupby('Cluster').agg(
+                    Priorities=('Cluster', 'size'),
+                    **({'Companies': (company_col, 'nunique')} if company_col else {}),
+                ).reset_index()
+                summary['Top Terms'] = [terms[c] for c in summary['Cluster']]
+                st.subheader("🧩 Clusters")
+                st.dataframe(summary, use_container_width=True)
+                st.dataframe(clustered.sort_values('Cluster'), use_container_width=True)
+                st.download_button(
+                    label="📥 Download Clusters as CSV",
+                    data=lambda: clustered.to_csv(index=False).encode('utf-8'),
+                    file_name=f"{bf}_clusters.csv",
+                    mime="text/csv",
+                    on_click="ignore"
+                )
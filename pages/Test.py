@@ -4,6 +4,10 @@ import json
 import ast
 from datetime import datetime
 import io
+from utils.text import clean_text_columns
+from utils.widgets import show_rollups
+from utils.rollups import build_rollups
+from utils.uploads import UPLOAD_TYPES, read_upload, spool_uploads
 
 # Streamlit App Configuration
 st.set_page_config(page_title="BF Consolidated Priority Extraction Tool", page_icon="🍳", layout="wide")
@@ -59,7 +63,7 @@ if 'extracted_df' not in st.session_state:
     st.session_state['extracted_df'] = pd.DataFrame()
 
 # File Upload
-uploaded_file = st.file_uploader("📂 Upload CSV or Excel file", type=['csv', 'xlsx'])
+uploaded_file = st.file_uploader("📂 Upload CSV, Excel or compressed (gz/zst/zip) file", type=UPLOAD_TYPES)
 
 # Expander for guidance
 with st.expander("💡 Sample Format & Troubleshooting Tips"):
@@ -72,15 +76,16 @@ with st.expander("💡 Sample Format & Troubleshooting Tips"):
     """)
 
 if uploaded_file:
-    file_extension = uploaded_file.name.split(".")[-1]
     try:
-        df = pd.read_csv(uploaded_file) if file_extension == "csv" else pd.read_excel(uploaded_file)
+        # Spool the upload to disk once, not on every rerun
+        upload, = spool_uploads([uploaded_file], st.session_state.setdefault('spooled_uploads', {}))
+        df = read_upload(upload)
         st.success("✅ File Uploaded Successfully!")
 
         extracted_df = extract_priorities(df)
 
         if not extracted_df.empty:
-            extracted_df['Description'] = extracted_df['Description'].apply(lambda x: ' '.join(x) if isinstance(x, list) else x)
+            clean_text_columns(extracted_df, ['Description'])
             st.session_state['extracted_df'] = extracted_df
 
             # Filter and Search Section
@@ -126,6 +131,7 @@ if uploaded_file:
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                 )
 
+            show_rollups(build_rollups(extracted_df, period_col='recent_year_quarter'), f"Consolidated_extracted_priorities_{date_str}")
             st.success("✅ Processed and ready for download!")  
         else:
             st.warning("⚠️ No priorities extracted. Please check the file format and data content.")
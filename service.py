@@ -0,0 +1,228 @@
+"""Local async HTTP service exposing the page transformations.
+
+Upload a file as the raw request body and the extracted rows stream back as
+CSV, JSON Lines or Parquet while the upload is still being processed:
+
+    curl --data-binary @signals.csv.gz \
+        "http://127.0.0.1:8600/extract/signal-bf?filename=signals.csv.gz&format=jsonl"
+
+Uploads are spooled to disk as they arrive, read chunk by chunk (gz/zst/zip
+and every workbook sheet, as in the pages) and flattened in a shared pool of
+worker processes, so many requests can be served at once. Date and quarter
+values are returned as uploaded: the pages type them from a whole column,
+which a streamed response never has.
+"""
+import argparse
+import asyncio
+import gzip
+import io
+import os
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+
+import pyarrow.parquet as pq
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from utils.extractors import missing_columns
+from utils.pipelines import PIPELINES, run_pipeline
+from utils.store import to_arrow
+from utils.uploads import CHUNK_ROWS, CHUNK_SIZE, READ_FORMATS, SPOOL_DIR, SpooledUpload, iter_upload, split_name
+
+try:
+    from zstandard import ZstdError
+except ImportError:
+    # Without zstandard, .zst uploads already fail with ValueError
+    ZstdError = ValueError
+
+# Chunks in flight per request; more overlap reading with extraction
+CHUNKS_IN_FLIGHT = max(2, os.cpu_count() or 1)
+# Malformed, truncated or mislabelled uploads; reported as 400 when the first chunk hits them
+READ_ERRORS = (ValueError, EOFError, zipfile.BadZipFile, gzip.BadGzipFile, ZstdError)
+# Cells the extractors could not handle; also reported as 400 when they are in the first chunk
+EXTRACT_ERRORS = (TypeError, AttributeError, KeyError)
+
+
+# -------------------------- Output Encoders -------------------------- #
+# Each encoder turns extracted chunks into response bytes. Chunks go through
+# the same Arrow conversion as the result store, so values match the pages'
+# downloads, apart from date and quarter columns, which stay as uploaded.
+
+class CsvEncoder:
+    content_type = 'text/csv; charset=utf-8'
+
+    def __init__(self):
+        self.header = True
+
+    def encode(self, df):
+        # An empty chunk has no columns to write, so the header waits for the first rows
+        if df.empty:
+            return b''
+        data = to_arrow(df).to_pandas().to_csv(index=False, header=self.header).encode('utf-8')
+        self.header = False
+        return data
+
+    def close(self):
+        return b''
+
+
+class JsonlEncoder:
+    content_type = 'application/x-ndjson'
+
+    def encode(self, df):
+        if df.empty:
+            return b''
+        return to_arrow(df).to_pandas().to_json(orient='records', lines=True, date_format='iso').rstrip('\n').encode('utf-8') + b'\n'
+
+    def close(self):
+        return b''
+
+
+class ParquetEncoder:
+    """Writes one row group per chunk, handing back the bytes produced so far after each one."""
+    content_type = 'application/vnd.apache.parquet'
+
+    def __init__(self):
+        self.sink = io.BytesIO()
+        self.writer = None
+
+    def _drain(self):
+        data = self.sink.getvalue()
+        self.sink.seek(0)
+        self.sink.truncate()
+        return data
+
+    def encode(self, df):
+        if df.empty:
+            return b''
+        table = to_arrow(df)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.sink, table.schema)
+        self.writer.write_table(table.cast(self.writer.schema))
+        return self._drain()
+
+    def close(self):
+        if self.writer is None:
+            return b''
+        self.writer.close()
+        return self._drain()
+
+
+ENCODERS = {'csv': CsvEncoder, 'jsonl': JsonlEncoder, 'parquet': ParquetEncoder}
+
+
+# -------------------------- Endpoints -------------------------- #
+
+async def index(request):
+    return JSONResponse({'pipelines': list(PIPELINES), 'formats': list(ENCODERS), 'inputs': READ_FORMATS})
+
+
+def _error(status_code, message):
+    return JSONResponse({'error': message}, status_code=status_code)
+
+
+async def _spool(request, file_name):
+    """Writes the streamed request body to a SpooledUpload, which deletes the file once dropped.
+
+    Body parts are batched and written from a worker thread, so disk writes never block the event loop.
+    """
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    size, pending = 0, bytearray()
+    with tempfile.NamedTemporaryFile(dir=SPOOL_DIR, suffix=f"_{file_name}", delete=False) as spool:
+        upload = SpooledUpload(file_name, spool.name, 0, None)
+        async for data in request.stream():
+            pending += data
+            size += len(data)
+            if len(pending) >= CHUNK_SIZE:
+                await asyncio.to_thread(spool.write, pending)
+                pending.clear()
+        await asyncio.to_thread(spool.write, pending)
+    upload.size = size
+    return upload
+
+
+async def extract(request):
+    """POST /extract/<pipeline>?filename=<name>&format=csv|jsonl|parquet with the file as the body."""
+    pipeline = request.path_params['pipeline']
+    if pipeline not in PIPELINES:
+        return _error(404, f"Unknown pipeline: {pipeline}")
+    output_format = request.query_params.get('format', 'csv')
+    if output_format not in ENCODERS:
+        return _error(400, f"Unsupported format: {output_format}")
+    file_name = os.path.basename(request.query_params.get('filename') or request.headers.get('X-Filename', 'upload.csv'))
+    if not file_name.lower().endswith('.zip') and split_name(file_name)[0] not in READ_FORMATS:
+        return _error(400, f"Unsupported file type: {file_name}")
+
+    upload = await _spool(request, file_name)
+    pool = request.app.state.pool
+    loop = asyncio.get_running_loop()
+    chunks = iter_upload(upload, CHUNK_ROWS)
+
+    def run(chunk):
+        return asyncio.wrap_future(pool.submit(run_pipeline, pipeline, chunk))
+
+    # The first chunk is checked and extracted before the response starts, so bad input still gets a 400
+    try:
+        chunk = await loop.run_in_executor(None, next, chunks, None)
+        if chunk is None:
+            return _error(400, "The uploaded file has no rows")
+        missing = missing_columns(chunk, PIPELINES[pipeline][0])
+        if missing:
+            return _error(400, f"Missing columns: {', '.join(missing)}")
+        first = await run(chunk)
+    except READ_ERRORS + EXTRACT_ERRORS as e:
+        chunks.close()
+        return _error(400, str(e))
+
+    encoder = ENCODERS[output_format]()
+
+    async def body():
+        pending = deque()
+        try:
+            yield encoder.encode(first)
+            while (chunk := await loop.run_in_executor(None, next, chunks, None)) is not None:
+                pending.append(run(chunk))
+                if len(pending) >= CHUNKS_IN_FLIGHT:
+                    yield encoder.encode(await pending.popleft())
+            while pending:
+                yield encoder.encode(await pending.popleft())
+            yield encoder.close()
+        finally:
+            # Also reached when the client disconnects: drop queued chunks and the spooled file
+            for future in pending:
+                future.cancel()
+            chunks.close()
+
+    stem = file_name.split('.')[0]
+    headers = {'Content-Disposition': f'attachment; filename="{stem}_{pipeline}.{output_format}"'}
+    return StreamingResponse(body(), media_type=encoder.content_type, headers=headers)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    with ProcessPoolExecutor(max_workers=app.state.workers) as pool:
+        app.state.pool = pool
+        yield
+
+
+def make_app(workers=None):
+    app = Starlette(routes=[
+        Route('/', index),
+        Route('/extract/{pipeline}', extract, methods=['POST']),
+    ], lifespan=lifespan)
+    app.state.workers = workers
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--address', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--workers', type=int, default=None, help='Extraction worker processes (default: CPU count)')
+    args = parser.parse_args()
+    uvicorn.run(make_app(args.workers), host=args.address, port=args.port)
@@ -0,0 +1 @@
+"""Shared helpers for the priority extraction pages."""
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.uploads import CHUNK_ROWS, split_name
+
+MB = 1024 * 1024
+# Peak memory per MB of raw input, read whole vs chunk by chunk (output plus its Arrow copy in the result store)
+FULL_MEMORY_FACTOR = {'csv': 6.0, 'jsonl': 6.0, 'json': 8.0, 'xlsx': 15.0}
+CHUNKED_MEMORY_FACTOR = 2.0
+CHUNK_OVERHEAD_MB = 256
+# Assumed decompression ratio of gz/zst/zip uploads
+COMPRESSION_RATIO = 5.0
+# Used when the sample preview could not project the row count
+BYTES_PER_ROW = 2_000
+SECONDS_PER_ROW = 0.0005
+# Downscaled jobs read smaller chunks in a single worker process
+DOWNSCALED_CHUNK_ROWS = CHUNK_ROWS // 5
+
+
+def _memory_limit_mb():
+    """Container (cgroup v2/v1) memory limit, else physical memory, in MB."""
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+            if value.isdigit() and int(value) < 1 << 60:
+                return int(value) / MB
+        except OSError:
+            pass
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / MB
+    except (ValueError, OSError, AttributeError):
+        return 4096
+
+
+MEMORY_BUDGET_MB = float(os.environ.get('PRIORITY_MEMORY_BUDGET_MB', _memory_limit_mb() * 0.6))
+MAX_CONCURRENT_JOBS = int(os.environ.get('PRIORITY_MAX_CONCURRENT_JOBS', 2))
+
+
+class JobEstimate:
+    """Projected footprint of one extraction, read whole (`memory_mb`) or chunk by chunk (`chunked_mb`)."""
+
+    def __init__(self, memory_mb, chunked_mb, seconds, rows):
+        self.memory_mb = memory_mb
+        self.chunked_mb = chunked_mb
+        self.seconds = seconds
+        self.rows = rows
+
+
+def estimate_job(uploads, metrics=None):
+    """Estimates memory and time from upload sizes, refined by utils.preview metrics when they project rows."""
+    memory_mb, raw_mb = 0.0, 0.0
+    for upload in uploads:
+        file_format, compression = split_name(upload.name)
+        size_mb = upload.size / MB
+        if compression or upload.extension == 'zip':
+            size_mb *= COMPRESSION_RATIO
+        raw_mb += size_mb
+        memory_mb += size_mb * FULL_MEMORY_FACTOR.get(file_format, max(FULL_MEMORY_FACTOR.values()))
+
+    metrics = metrics or {}
+    rows = metrics.get('Projected Input Rows') or round(raw_mb * MB / BYTES_PER_ROW)
+    seconds = metrics.get('Estimated Full Runtime (s)') or rows * SECONDS_PER_ROW
+    chunked_mb = min(memory_mb, raw_mb * CHUNKED_MEMORY_FACTOR + CHUNK_OVERHEAD_MB)
+    return JobEstimate(round(memory_mb, 1), round(chunked_mb, 1), round(seconds, 1), rows)
+
+
+class Job:
+    """A queued or admitted extraction. Once admitted, `downscaled` says whether to run in low-memory mode."""
+
+    def __init__(self, estimate):
+        self.estimate = estimate
+        self.downscaled = False
+        self.reserved_mb = 0.0
+        self.queued_at = time.monotonic()
+
+    @property
+    def max_workers(self):
+        return 1 if self.downscaled else None
+
+    @property
+    def chunk_rows(self):
+        return DOWNSCALED_CHUNK_ROWS if self.downscaled else CHUNK_ROWS
+
+
+class AdmissionController:
+    """Process-wide FIFO gate that caps concurrent extractions and their summed memory estimate.
+
+    A job runs as estimated if it fits in the free budget, is downscaled to
+    chunked mode if only that fits, and otherwise waits for running jobs to
+    finish. A job too large for even the whole budget still runs, downscaled
+    and alone, rather than waiting forever.
+    """
+
+    def __init__(self, memory_budget_mb=MEMORY_BUDGET_MB, max_jobs=MAX_CONCURRENT_JOBS):
+        self.memory_budget_mb = memory_budget_mb
+        self.max_jobs = max_jobs
+        self._cond = threading.Condition()
+        self._queue = []
+        self._running = []
+
+    def _try_admit(self, job):
+        if self._queue[0] is not job or len(self._running) >= self.max_jobs:
+            return False
+        free_mb = self.memory_budget_mb - sum(running.reserved_mb for running in self._running)
+        if job.estimate.memory_mb <= free_mb:
+            job.reserved_mb = job.estimate.memory_mb
+        elif job.estimate.chunked_mb <= free_mb or not self._running:
+            job.downscaled, job.reserved_mb = True, job.estimate.chunked_mb
+        else:
+            return False
+        self._queue.pop(0)
+        self._running.append(job)
+        return True
+
+    def status(self):
+        """Returns (queued jobs, running jobs, reserved MB) for display."""
+        with self._cond:
+            return len(self._queue), len(self._running), sum(job.reserved_mb for job in self._running)
+
+    @contextmanager
+    def slot(self, estimate, on_wait=None, poll_seconds=1.0):
+        """Queues a job and yields it once admitted, calling on_wait(position) while it waits.
+
+        The slot is given back on exit, including when the waiting session is
+        stopped (on_wait may raise, e.g. on a Streamlit rerun).
+        """
+        job = Job(estimate)
+        with self._cond:
+            self._queue.append(job)
+        try:
+            while True:
+                with self._cond:
+                    if self._try_admit(job):
+                        break
+                    position = self._queue.index(job) + 1
+                if on_wait:
+                    on_wait(position)
+                with self._cond:
+                    self._cond.wait(poll_seconds)
+            yield job
+        finally:
+            with self._cond:
+                if job in self._queue:
+                    self._queue.remove(job)
+                if job in self._running:
+                    self._running.remove(job)
+                self._cond.notify_all()
+
+
+ADMISSION = AdmissionController()
@@ -0,0 +1,107 @@
+import re
+
+import pandas as pd
+
+# -------------------------- Date & Period Columns -------------------------- #
+DATE_COLUMNS = ['Generated On', 'Refreshed Date', 'Publication Month', 'Highlights Month', 'recent_year_month', 'Recent Year Month']
+QUARTER_COLUMNS = ['recent_year_quarter', 'Recent Year Quater', 'Recent Year Quarter']
+
+# Placeholders the extractors write when a value is missing
+MISSING_VALUES = ['', '-', 'N/A', 'nan', 'NaN', 'None', 'NaT']
+
+# Tried in order; the first that parses every sampled value wins. Numeric day/month layouts are
+# month-first only, as pandas reads them: a day-first format would also match a sample whose days
+# are all <= 12 and silently swap day and month. Day-first values (day > 12) fall through to 'mixed'.
+DATE_FORMATS = [
+    '%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%Y-%m', '%Y/%m/%d', '%m/%d/%Y',
+    '%m-%d-%Y', '%b %Y', '%B %Y', '%b-%Y', '%m/%Y', 'ISO8601',
+]
+FORMAT_SAMPLE_SIZE = 200
+DATE_UNIT = 'us'
+
+_QUARTER_PATTERN = re.compile(r'(?P<y1>\d{4})\s*[-/ ]?\s*Q(?P<q1>[1-4])|Q(?P<q2>[1-4])\s*[-/ ]?\s*(?P<y2>\d{4})', re.IGNORECASE)
+
+
+def _distinct_text(series):
+    """Factorizes a column so each distinct value is parsed once; returns (codes, cleaned uniques)."""
+    codes, uniques = pd.factorize(series)
+    text = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    return codes, text.mask(text.isin(MISSING_VALUES))
+
+
+def _to_datetime(text, fmt):
+    """Parses with one format to tz-naive UTC (Excel cannot hold timezone-aware values).
+
+    The unit is fixed, so every result, chunk and file shares one Arrow/Parquet schema.
+    """
+    return pd.to_datetime(text, format=fmt, errors='coerce', utc=True).dt.tz_localize(None).dt.as_unit(DATE_UNIT)
+
+
+def _infer_format(values):
+    sample = values.dropna().head(FORMAT_SAMPLE_SIZE)
+    if sample.empty:
+        return None
+    best_format, best_hits = None, 0
+    for fmt in DATE_FORMATS:
+        hits = _to_datetime(sample, fmt).notna().sum()
+        if hits == len(sample):
+            return fmt
+        if hits > best_hits:
+            best_format, best_hits = fmt, hits
+    return best_format
+
+
+def parse_dates(series, coerce=False):
+    """Parses a date-like column to datetime64, inferring its format from a sample of distinct values.
+
+    Values the inferred format misses are parsed individually. If some still fail, the column is
+    returned unchanged so no date is lost, unless `coerce` is set (filters), which turns them into NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    codes, text = _distinct_text(series)
+    parsed = _to_datetime(text, _infer_format(text) or 'mixed')
+    missed = parsed.isna() & text.notna()
+    if missed.any():
+        parsed[missed] = _to_datetime(text[missed], 'mixed')
+        if not coerce and (parsed.isna() & text.notna()).any():
+            return series
+    return pd.Series(parsed.array.take(codes, allow_fill=True), index=series.index, name=series.name)
+
+
+def parse_quarters(series, coerce=False):
+    """Parses quarter labels such as '2024 Q3', 'Q3-2024' or '2024Q3' to a quarterly Period column.
+
+    Like parse_dates, a column holding any label this cannot read (e.g. 'FY24 Q3', 'H1 2024') is
+    returned unchanged unless `coerce` is set, which turns those labels into NaT.
+    """
+    if isinstance(series.dtype, pd.PeriodDtype):
+        return series
+    codes, text = _distinct_text(series)
+    parts = text.str.extract(_QUARTER_PATTERN)
+    labels = parts['y1'].fillna(parts['y2']) + 'Q' + parts['q1'].fillna(parts['q2'])
+    if not coerce and (labels.isna() & text.notna()).any():
+        return series
+    parsed = pd.PeriodIndex(labels.astype(object).where(labels.notna(), None).tolist(), freq='Q')
+    return pd.Series(parsed.array.take(codes, allow_fill=True), index=series.index, name=series.name)
+
+
+def parse_date_columns(df):
+    """Parses every known date and quarter column of an extracted frame in place."""
+    for col in df.columns:
+        if col in QUARTER_COLUMNS:
+            df[col] = parse_quarters(df[col])
+        elif col in DATE_COLUMNS:
+            df[col] = parse_dates(df[col])
+    return df
+
+
+def period_labels(series):
+    """Formats a Period column as sortable labels like '2024Q3', keeping missing values as NA."""
+    labels = pd.Series(series.array.strftime('%YQ%q' if series.array.freqstr.startswith('Q') else '%Y-%m'), index=series.index, dtype='string')
+    return labels.mask(series.isna())
+
+
+def latest_mask(df, company_col, date_col):
+    """Marks the rows holding each company's most recent date."""
+    return df[date_col].eq(df.groupby(company_col)[date_col].transform('max'))
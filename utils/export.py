@@ -0,0 +1,137 @@
+import io
+import re
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from utils.dates import DATE_COLUMNS, QUARTER_COLUMNS
+
+# Candidate columns per partitioning, in the order the extraction pages emit them
+PARTITION_COLUMNS = {
+    'BF': ['BF', 'Business Function'],
+    'Company': ['Company', 'Company Name'],
+    'Period': QUARTER_COLUMNS + DATE_COLUMNS,
+}
+EXPORT_FORMATS = ['csv', 'xlsx', 'parquet']
+UNKNOWN_PARTITION = 'Unknown'
+CSV_BATCH_ROWS = 50_000
+# Rows an Excel sheet can hold below its header row
+EXCEL_MAX_ROWS = 1_048_575
+
+
+def partition_options(table):
+    """Maps 'BF', 'Company' and 'Period' to the column of `table` each one partitions by."""
+    options = {}
+    for label, candidates in PARTITION_COLUMNS.items():
+        column = next((col for col in candidates if col in table.column_names), None)
+        if column:
+            options[label] = column
+    return options
+
+
+def partition_keys(column):
+    """Partition name per row: dates are grouped by month, blanks fall under UNKNOWN_PARTITION."""
+    if pa.types.is_timestamp(column.type) or pa.types.is_date(column.type):
+        keys = pc.strftime(column, format='%Y-%m')
+    else:
+        keys = pc.cast(column, pa.string())
+    keys = pc.fill_null(keys, UNKNOWN_PARTITION)
+    return pc.if_else(pc.equal(pc.utf8_trim_whitespace(keys), ''), UNKNOWN_PARTITION, keys)
+
+
+def iter_partitions(table, column):
+    """Yields (name, table) per distinct key of `column`, in name order, materialising one partition at a time.
+
+    Rows are grouped with a single argsort over dictionary codes, then each
+    partition is gathered from the memory-mapped table with `take`.
+    """
+    encoded = pc.dictionary_encode(partition_keys(table[column]).combine_chunks())
+    codes = encoded.indices.to_numpy(zero_copy_only=False)
+    names = encoded.dictionary.to_pylist()
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes, minlength=len(names))
+    ends = np.cumsum(counts)
+    for code in sorted(range(len(names)), key=names.__getitem__):
+        yield names[code], table.take(pa.array(order[ends[code] - counts[code]:ends[code]]))
+
+
+def _file_stem(name, used):
+    stem = re.sub(r'[^\w\-. ]+', '_', name).strip(' .')[:100] or UNKNOWN_PARTITION
+    candidate, suffix = stem, 2
+    while candidate.lower() in used:
+        candidate, suffix = f"{stem}_{suffix}", suffix + 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def _write_partition(stream, part, file_format):
+    if file_format == 'csv':
+        # Written batch by batch with pandas, so partitions match the pages' CSV downloads
+        text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+        for i, batch in enumerate(part.to_batches(max_chunksize=CSV_BATCH_ROWS)):
+            batch.to_pandas().to_csv(text, index=False, header=i == 0)
+        if part.num_rows == 0:
+            pd.DataFrame(columns=part.column_names).to_csv(text, index=False)
+        text.flush()
+        text.detach()
+    elif file_format == 'xlsx':
+        stream.write(table_excel(part, 'Priorities'))
+    elif file_format == 'parquet':
+        buffer = io.BytesIO()
+        pq.write_table(part, buffer)
+        stream.write(buffer.getvalue())
+    else:
+        raise ValueError(f"Unsupported export format: {file_format}")
+
+
+def table_csv(table):
+    """CSV bytes of a whole table, converted batch by batch; meant as a lazy download_button `data`."""
+    buffer = io.BytesIO()
+    _write_partition(buffer, table, 'csv')
+    return buffer.getvalue()
+
+
+def table_excel(table, sheet_name='Extracted Priorities'):
+    """XLSX bytes of a whole table; meant as a lazy download_button `data`."""
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
+        table.to_pandas().to_excel(writer, index=False, sheet_name=sheet_name)
+    return buffer.getvalue()
+
+
+def excel_sheets(frames):
+    """Names of the frames in `frames` small enough to be written to an Excel sheet."""
+    return [name for name, frame in frames.items() if len(frame) <= EXCEL_MAX_ROWS]
+
+
+def frames_excel(frames):
+    """XLSX bytes with one sheet per frame that fits in Excel; meant as a lazy download_button `data`."""
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
+        for name in excel_sheets(frames):
+            frames[name].to_excel(writer, index=False, sheet_name=name)
+    return buffer.getvalue()
+
+
+def write_partitioned_zip(dest, table, column, file_format, prefix):
+    """Writes one `file_format` file per partition of `table` by `column` into a ZIP at `dest`."""
+    compression = zipfile.ZIP_DEFLATED if file_format == 'csv' else zipfile.ZIP_STORED
+    used = set()
+    with zipfile.ZipFile(dest, 'w', compression=compression) as archive:
+        for name, part in iter_partitions(table, column):
+            with archive.open(f"{prefix}/{_file_stem(name, used)}.{file_format}", 'w', force_zip64=True) as stream:
+                _write_partition(stream, part, file_format)
+    return dest
+
+
+def partitioned_zip(table, column, file_format, prefix):
+    """Builds the partitioned ZIP in an anonymous temp file, deleted once closed, and returns it rewound."""
+    dest = tempfile.TemporaryFile()
+    write_partitioned_zip(dest, table, column, file_format, prefix)
+    dest.seek(0)
+    return dest
@@ -0,0 +1,260 @@
+import ast
+import json
+from functools import lru_cache
+from itertools import islice
+
+import pandas as pd
+
+from utils.text import clean_text_columns, unescape_binary_text
+from utils.uploads import SHEET_COLUMN
+
+# -------------------------- Required Columns -------------------------- #
+COMPANY_BF_COLUMNS = ['Company', 'Year', 'Report Name', 'Quarter', 'Report Type', 'Refreshed Date', 'Formatted Priorities']
+SIGNAL_BF_COLUMNS = ['Company', 'Publication Month', 'Months Considered', 'Highlights Month', 'Priority Type', 'Formatted Priorities']
+BF_CONSOLIDATED_COLUMNS = ['Company Name', 'Consolidated AI Response']
+CONSOLIDATED_ALL_COLUMNS = [
+    'Company Name', 'Generated On', 'Is Outdated',
+    'Input Output Ratio', 'Transcript AI Response',
+    'Signal AI Response', 'Consolidated AI Response'
+]
+AGGREGATED_COLUMNS = ['Priority Description', 'Usecase', 'Functional Workload', 'Company']
+
+# AI response columns decoded by Consolidated All
+PRIORITY_COLUMNS = ['Transcript AI Response', 'Signal AI Response', 'Consolidated AI Response']
+AGGREGATED_OUTPUT_COLUMNS = [
+    'S.No.', 'Company', 'Business Function', 'Priority Name', 'Description',
+    'Usecases', 'Workload', 'Recent Year Month', 'Recent Year Quarter',
+    'Months Considered', 'Quarter Considered', 'Primary Vertical'
+]
+
+
+def missing_columns(df, required_columns):
+    """Returns the required columns that are absent from the DataFrame."""
+    return [col for col in required_columns if col not in df.columns]
+
+# -------------------------- Extractors -------------------------- #
+# Extractors are plain functions (no Streamlit calls) so they can run in worker
+# processes. Each returns the flattened frame and the companies whose
+# 'Formatted Priorities' could not be decoded.
+
+def extract_company_bf(df):
+    """Flattens Company BF 'Formatted Priorities' into one row per priority."""
+    extracted_data = []
+    invalid_companies = []
+
+    for _, row in df.iterrows():
+        company = row.get('Company', 'Unknown')
+        year = row.get('Year', 'N/A')
+        report_name = row.get('Report Name', 'N/A')
+        quarter = row.get('Quarter', 'N/A')
+        report_type = row.get('Report Type', 'N/A')
+        refreshed_date = row.get('Refreshed Date', 'N/A')
+
+        try:
+            priorities = json.loads(str(row.get('Formatted Priorities', '{}')))
+        except json.JSONDecodeError:
+            invalid_companies.append(company)
+            continue
+        if not isinstance(priorities, dict):
+            invalid_companies.append(company)
+            continue
+
+        for category, priority_list in priorities.items():
+            for priority_item in priority_list:
+                extracted_data.append({
+                    'Company': company,
+                    'Year': year,
+                    'Report Name': report_name,
+                    'Quarter': quarter,
+                    'Report Type': report_type,
+                    'Refreshed Date': refreshed_date,
+                    'BF': category,
+                    'Priority': priority_item.get('priority', '-'),
+                    'Description': priority_item.get('description', '-'),
+                    'Recent Year Quater': priority_item.get('recent_year_quarter', '-'),
+                })
+
+    return pd.DataFrame(extracted_data), invalid_companies
+
+
+def extract_signal_bf(df):
+    """Flattens Signal BF 'Formatted Priorities' into one row per priority."""
+    extracted_data = []
+    invalid_companies = []
+
+    for _, row in df.iterrows():
+        company = row.get('Company', 'Unknown')
+        publication_month = row.get('Publication Month', 'N/A')
+        months_considered = row.get('Months Considered', 'N/A')
+        highlights_month = row.get('Highlights Month', 'N/A')
+        priority_type = row.get('Priority Type', 'N/A')
+
+        try:
+            priorities = json.loads(str(row.get('Formatted Priorities', '{}')))
+        except json.JSONDecodeError:
+            invalid_companies.append(company)
+            continue
+        if not isinstance(priorities, dict):
+            invalid_companies.append(company)
+            continue
+
+        for category, priority_list in priorities.items():
+            for priority in priority_list:
+                extracted_data.append({
+                    'Company': company,
+                    'Publication Month': publication_month,
+                    'Months Considered': months_considered,
+                    'Highlights Month': highlights_month,
+                    'Priority Type': priority_type,
+                    'BF': category,
+                    'Priority': priority.get('priority', '-'),
+                    'Description': priority.get('description', '-'),
+                    'Recent Year Month': priority.get('recent_year_month', '-')
+                })
+
+    return pd.DataFrame(extracted_data), invalid_companies
+
+
+def extract_bf_consolidated(df):
+    """Flattens BF Consolidated 'Consolidated AI Response' into one row per priority."""
+    extracted_data = []
+    invalid_companies = []
+
+    for _, row in df.iterrows():
+        company = row.get('Company Name', 'Unknown')
+
+        try:
+            priorities = json.loads(str(row.get('Consolidated AI Response', '{}')))
+        except json.JSONDecodeError:
+            invalid_companies.append(company)
+            continue
+        if not isinstance(priorities, dict):
+            invalid_companies.append(company)
+            continue
+
+        for category, priority_list in priorities.items():
+            for priority_item in priority_list:
+                extracted_data.append({
+                    'Company': company,
+                    'BF': category,
+                    'Priority': priority_item.get('priority', '-'),
+                    'Description': priority_item.get('description', '-'),
+                    'source': priority_item.get('source', '-'),
+                    'recent_year_month': priority_item.get('recent_year_month', '-'),
+                    'recent_year_quarter': priority_item.get('recent_year_quarter', '-'),
+                })
+
+    return pd.DataFrame(extracted_data), invalid_companies
+
+
+def extract_consolidated_all(df, priority_columns=PRIORITY_COLUMNS):
+    """Flattens every AI response column of Consolidated All, accepting JSON or Python-repr dicts.
+
+    Raises ValueError on a missing required column. The invalid list names the
+    companies with a response that could not be decoded.
+    """
+    extracted_data = []
+    invalid_companies = []
+
+    for col in CONSOLIDATED_ALL_COLUMNS:
+        if col not in df.columns:
+            raise ValueError(f"Missing required column: {col}")
+
+    for _, row in df.iterrows():
+        company = row['Company Name']
+        generated = row['Generated On']
+        is_outdated = row['Is Outdated']
+        input_output_ratio = row['Input Output Ratio']
+
+        for col in priority_columns:
+            content = row.get(col, '{}')
+            if pd.isna(content) or str(content).strip() in ["", "nan", "None"]:
+                continue
+
+            try:
+                content_str = str(content)
+                try:
+                    priorities = json.loads(content_str)
+                except json.JSONDecodeError:
+                    priorities = ast.literal_eval(content_str)
+
+                if not isinstance(priorities, dict):
+                    raise ValueError("Parsed content is not a dictionary")
+
+                for category, priority_list in priorities.items():
+                    for priority in priority_list:
+                        extracted_data.append({
+                            'Company': company,
+                            'BF': category,
+                            'Priority': priority.get('priority', '-'),
+                            'Description': priority.get('description', '-'),
+                            'source': priority.get('source', '-'),
+                            'recent_year_month': priority.get('recent_year_month', '-'),
+                            'recent_year_quarter': priority.get('recent_year_quarter', '-'),
+                            'AI Column Source': col,
+                            'Generated On': generated,
+                            'Is Outdated': is_outdated,
+                            'Input Output Ratio': input_output_ratio
+                        })
+
+            except Exception as e:
+                print(f"⚠️ Error processing {col} for {company}: {e}")
+                invalid_companies.append(company)
+                continue
+
+    return clean_text_columns(pd.DataFrame(extracted_data), ['Description']), invalid_companies
+
+
+def _top_names(items):
+    if isinstance(items, dict):
+        items = [{'name': k, 'score': v} for k, v in items.items()]
+
+    if isinstance(items, list) and all(isinstance(d, dict) and 'name' in d and 'score' in d for d in items):
+        sorted_items = sorted(items, key=lambda x: x['score'], reverse=True)
+        return "; ".join(item['name'] for item in islice(sorted_items, 3))
+    return ""
+
+
+@lru_cache(maxsize=100_000)
+def _parse_usecase_text(text):
+    # Repeated cells are common, so each distinct string is parsed once
+    return _top_names(ast.literal_eval(text))
+
+
+def parse_usecases(input_data):
+    """Parses dict or list of dicts with 'name' and 'score' from malformed strings (using ast)."""
+    try:
+        if isinstance(input_data, str):
+            cleaned = input_data.strip()
+            if cleaned.startswith("//"): cleaned = cleaned[2:]
+            if cleaned.endswith("//"): cleaned = cleaned[:-2]
+            return _parse_usecase_text(cleaned)
+        return _top_names(input_data)
+    except Exception:
+        return ""
+
+
+def transform_aggregated(df):
+    """Runs Aggregated steps 1-3: unescapes descriptions, keeps the top usecases and workloads, selects the output columns.
+
+    Date columns stay as text; parse them once over the whole result with parse_date_columns.
+    """
+    missing = missing_columns(df, AGGREGATED_COLUMNS)
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    # Step 1: Convert and clean text
+    df['Description'] = unescape_binary_text(df['Priority Description'])
+    # Step 2: Parse usecases and workloads
+    df['Usecases'] = df['Usecase'].apply(parse_usecases)
+    df['Workload'] = df['Functional Workload'].apply(parse_usecases)
+
+    # Step 3: Define final columns
+    output_cols = list(AGGREGATED_OUTPUT_COLUMNS)
+    if SHEET_COLUMN in df.columns:
+        output_cols.insert(0, SHEET_COLUMN)
+    for col in output_cols:
+        if col not in df.columns:
+            df[col] = '-'
+
+    return df[output_cols].fillna('-')
@@ -0,0 +1,45 @@
+import json
+
+import pandas as pd
+
+from utils.dates import parse_dates
+
+TRUE_VALUES = ['true', '1', 'yes', 'y']
+
+# -------------------------- Row Filters -------------------------- #
+# A filter spec maps an input column to a condition:
+#   list of values  -> keep rows whose value is in the list
+#   (start, end)    -> keep rows whose date falls in the inclusive range
+#   bool            -> keep rows whose flag equals it (e.g. {'Is Outdated': False})
+# Specs are applied to raw input rows, before any JSON is decoded.
+
+
+def _as_bool(series):
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    return series.astype(str).str.strip().str.lower().isin(TRUE_VALUES)
+
+
+def apply_row_filters(df, filters):
+    """Returns the rows of df that satisfy every condition in the filter spec."""
+    if not filters or df.empty:
+        return df
+    mask = pd.Series(True, index=df.index)
+    for column, condition in filters.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if isinstance(condition, bool):
+            mask &= _as_bool(values) == condition
+        elif isinstance(condition, tuple):
+            start, end = pd.Timestamp(condition[0]), pd.Timestamp(condition[1]) + pd.Timedelta(days=1)
+            dates = parse_dates(values, coerce=True)
+            mask &= (dates >= start) & (dates < end)
+        else:
+            mask &= values.isin(condition)
+    return df[mask]
+
+
+def filters_key(filters):
+    """Stable text form of a filter spec, used to key filtered results in the result store."""
+    return json.dumps(filters or {}, sort_keys=True, default=str)
@@ -0,0 +1,79 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+from utils.extractors import missing_columns
+from utils.filters import apply_row_filters
+from utils.uploads import CHUNK_ROWS, SHEET_COLUMN, iter_chunks, list_parts, with_sheet
+
+
+def _ingest_one(display_name, file_name, path, member, sheet, extractor, required_columns, filters=None, chunksize=CHUNK_ROWS):
+    """Reads and flattens a single file, zip member or sheet chunk by chunk. Runs inside a worker process."""
+    start = time.perf_counter()
+    input_rows, kept_rows, frames, invalid_companies, error = 0, 0, [], [], ''
+    try:
+        for chunk in iter_chunks(path, file_name, member, chunksize, sheet=sheet):
+            input_rows += len(chunk)
+            missing = missing_columns(chunk, required_columns)
+            if missing:
+                raise ValueError(f"Missing columns: {', '.join(missing)}")
+            # Filter raw rows before their JSON is decoded
+            chunk = apply_row_filters(chunk, filters)
+            kept_rows += len(chunk)
+            chunk_df, chunk_invalid = extractor(chunk)
+            frames.append(chunk_df)
+            invalid_companies.extend(chunk_invalid)
+    except Exception as e:
+        # A file that fails part-way is dropped whole rather than merged with only its first chunks
+        partial_rows = sum(len(frame) for frame in frames)
+        error = str(e) + (f" ({partial_rows:,} rows extracted before the error were discarded)" if partial_rows else '')
+        frames = []
+    extracted_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    report = {
+        'File': display_name,
+        SHEET_COLUMN: sheet or '',
+        'Input Rows': input_rows,
+        'Rows After Filters': kept_rows,
+        'Extracted Rows': len(extracted_df),
+        'Invalid JSON Rows': len(invalid_companies),
+        'Error': error,
+        'Seconds': round(time.perf_counter() - start, 3),
+    }
+    return report, extracted_df
+
+
+def ingest_files(files, extractor, required_columns, filters=None, max_workers=None, sheets=None, chunksize=CHUNK_ROWS):
+    """Reads and flattens several uploads in parallel worker processes.
+
+    `files` is a list of (file name, spooled path) pairs and `extractor` one of the
+    functions in utils.extractors. Every CSV/JSON/Excel member of a zip upload and
+    every sheet of a multi-sheet workbook (or only those in `sheets`) is processed
+    and schema-checked as its own file. Returns the merged frame, with leading
+    'Source File' and, for workbooks, 'Sheet' columns, and a per-file report of
+    timings and error counts. `filters` is a utils.filters spec applied to input
+    rows before decoding, and `chunksize` bounds the rows each worker holds at once.
+    """
+    tasks = [(display_name, name, path, member, sheet)
+             for name, path in files
+             for display_name, member, sheet in list_parts(path, name, sheets)]
+
+    if len(tasks) <= 1:
+        results = [_ingest_one(*task, extractor, required_columns, filters, chunksize) for task in tasks]
+    else:
+        workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_ingest_one, *task, extractor, required_columns, filters, chunksize) for task in tasks]
+            results = [future.result() for future in futures]
+
+    reports, frames = [], []
+    for report, extracted_df in results:
+        reports.append(report)
+        if not extracted_df.empty:
+            with_sheet(extracted_df, report[SHEET_COLUMN] or None)
+            extracted_df.insert(0, 'Source File', report['File'])
+            frames.append(extracted_df)
+
+    merged_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return merged_df, pd.DataFrame(reports)
@@ -0,0 +1,52 @@
+from utils.extractors import (
+    AGGREGATED_COLUMNS, BF_CONSOLIDATED_COLUMNS, COMPANY_BF_COLUMNS, CONSOLIDATED_ALL_COLUMNS, SIGNAL_BF_COLUMNS,
+    extract_bf_consolidated, extract_company_bf, extract_consolidated_all, extract_signal_bf, transform_aggregated,
+)
+from utils.text import clean_text_columns
+
+# -------------------------- Chunk Pipelines -------------------------- #
+# Each page's transformation as a plain function of one input chunk, so it can
+# run in worker processes outside Streamlit (e.g. behind service.py). Date and
+# quarter columns are left as text: parse_date_columns decides a column's type
+# from all of its values, so it runs once over the whole result, not per chunk.
+
+
+def _finish(df):
+    if not df.empty:
+        clean_text_columns(df, ['Description'])
+    return df
+
+
+def signal_bf(chunk):
+    return _finish(extract_signal_bf(chunk)[0])
+
+
+def company_bf(chunk):
+    return _finish(extract_company_bf(chunk)[0])
+
+
+def bf_consolidated(chunk):
+    return _finish(extract_bf_consolidated(chunk)[0])
+
+
+def consolidated_all(chunk):
+    return extract_consolidated_all(chunk)[0]
+
+
+def aggregated(chunk):
+    return transform_aggregated(chunk)
+
+
+# Pipeline name -> (required input columns, chunk function)
+PIPELINES = {
+    'signal-bf': (SIGNAL_BF_COLUMNS, signal_bf),
+    'company-bf': (COMPANY_BF_COLUMNS, company_bf),
+    'bf-consolidated': (BF_CONSOLIDATED_COLUMNS, bf_consolidated),
+    'consolidated-all': (CONSOLIDATED_ALL_COLUMNS, consolidated_all),
+    'aggregated': (AGGREGATED_COLUMNS, aggregated),
+}
+
+
+def run_pipeline(name, chunk):
+    """Runs the named pipeline on one chunk; picklable entry point for worker processes."""
+    return PIPELINES[name][1](chunk)
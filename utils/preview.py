@@ -0,0 +1,106 @@
+import ast
+import json
+import math
+import time
+
+import pandas as pd
+
+from utils.uploads import iter_upload, split_name
+
+PREVIEW_ROWS = 500
+# A random preview samples from this many times the preview size, read from the start of the file
+RANDOM_POOL_FACTOR = 20
+
+
+def _is_empty(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return True
+    return str(value).strip() in ('', 'nan', 'None')
+
+
+def _is_malformed(value, allow_python_repr):
+    text = str(value).strip()
+    try:
+        json.loads(text)
+        return False
+    except ValueError:
+        pass
+    if allow_python_repr:
+        try:
+            ast.literal_eval(text.strip('/'))
+            return False
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            pass
+    return True
+
+
+def malformed_rate(df, json_columns, allow_python_repr=False):
+    """Share of non-empty cells in the JSON columns that neither json nor (optionally) ast can parse."""
+    total = malformed = 0
+    for col in json_columns:
+        if col not in df.columns:
+            continue
+        for value in df[col]:
+            if _is_empty(value):
+                continue
+            total += 1
+            malformed += _is_malformed(value, allow_python_repr)
+    return malformed / total if total else 0.0
+
+
+def read_sample(upload, rows=PREVIEW_ROWS, random_sample=False, seed=0):
+    """Reads the first `rows` input rows, or a random sample of the first rows × RANDOM_POOL_FACTOR."""
+    pool = rows * RANDOM_POOL_FACTOR if random_sample else rows
+    # nrows keeps Excel, which cannot be read in chunks, from reading the whole sheet
+    chunks = iter_upload(upload, chunksize=pool, nrows=pool)
+    try:
+        sample = next(chunks, pd.DataFrame())
+    finally:
+        chunks.close()
+    if random_sample and len(sample) > rows:
+        sample = sample.sample(rows, random_state=seed)
+    return sample.head(rows)
+
+
+def estimate_rows(upload, sample):
+    """Projects the input row count of an uncompressed CSV/JSON Lines upload from its size; None otherwise."""
+    file_format, compression = split_name(upload.name)
+    if sample.empty or compression or file_format not in ('csv', 'jsonl'):
+        return None
+    if file_format == 'csv':
+        sample_bytes = len(sample.to_csv(index=False).encode('utf-8'))
+    else:
+        sample_bytes = len(sample.to_json(orient='records', lines=True).encode('utf-8'))
+    return max(len(sample), round(upload.size * len(sample) / sample_bytes))
+
+
+def run_preview(uploads, extract, json_columns, rows=PREVIEW_ROWS, random_sample=False, allow_python_repr=False):
+    """Flattens a small sample of the uploads and projects the full run from it.
+
+    `extract` maps an input frame to its extracted frame. Returns the sample
+    output and a dict of metrics; projections are None when the input row
+    count cannot be estimated without a full pass (compressed, zip, Excel).
+    """
+    per_upload = max(1, rows // len(uploads))
+    samples, projected_inputs = [], []
+    for upload in uploads:
+        sample = read_sample(upload, per_upload, random_sample)
+        samples.append(sample)
+        projected_inputs.append(estimate_rows(upload, sample))
+    sample = pd.concat(samples, ignore_index=True)
+
+    start = time.perf_counter()
+    output = extract(sample)
+    elapsed = time.perf_counter() - start
+
+    input_rows = None if None in projected_inputs else sum(projected_inputs)
+    ratio = len(output) / len(sample) if len(sample) else 0.0
+    metrics = {
+        'Sample Rows': len(sample),
+        'Sample Output Rows': len(output),
+        'Malformed Cell Rate': malformed_rate(sample, json_columns, allow_python_repr),
+        'Projected Input Rows': input_rows,
+        'Projected Output Rows': None if input_rows is None else round(input_rows * ratio),
+        'Estimated Full Runtime (s)': None if input_rows is None or not len(sample) else round(elapsed / len(sample) * input_rows, 1),
+    }
+    return output, metrics
@@ -0,0 +1,58 @@
+import pandas as pd
+
+from utils.dates import MISSING_VALUES, period_labels
+
+CUBE = 'Company x BF x Period'
+
+
+def _period_values(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if isinstance(series.dtype, pd.PeriodDtype):
+        return period_labels(series)
+    period = series.astype('string').str.strip()
+    return period.mask(period.isin(MISSING_VALUES))
+
+
+def build_rollups(df, company_col='Company', bf_col='BF', period_col=None):
+    """Builds summary tables of priority counts per BF, company and period.
+
+    One group-by over company × BF × period produces the cube; the per-BF,
+    per-company and per-period rollups are then aggregated from that much
+    smaller table instead of rescanning the extracted rows.
+    """
+    if df.empty or company_col not in df.columns or bf_col not in df.columns:
+        return {}
+
+    if period_col in df.columns:
+        period = _period_values(df[period_col])
+    else:
+        period = pd.Series(pd.NA, index=df.index, dtype='string')
+    keys = pd.DataFrame({
+        'Company': df[company_col].astype('string'),
+        'BF': df[bf_col].astype('string'),
+        'Period': period,
+    })
+    cube = keys.groupby(['Company', 'BF', 'Period'], dropna=False).size().rename('Priorities').reset_index()
+
+    by_bf = cube.groupby('BF', dropna=False).agg(
+        Priorities=('Priorities', 'sum'),
+        Companies=('Company', 'nunique'),
+        **{'Latest Period': ('Period', 'max')},
+    ).reset_index().sort_values('Priorities', ascending=False)
+    by_company = cube.groupby('Company', dropna=False).agg(
+        Priorities=('Priorities', 'sum'),
+        BFs=('BF', 'nunique'),
+        **{'Latest Period': ('Period', 'max')},
+    ).reset_index().sort_values('Priorities', ascending=False)
+    by_period = cube.dropna(subset=['Period']).groupby('Period').agg(
+        Priorities=('Priorities', 'sum'),
+        Companies=('Company', 'nunique'),
+    ).reset_index()
+
+    return {
+        'By BF': by_bf.reset_index(drop=True),
+        'By Company': by_company.reset_index(drop=True),
+        'By Period': by_period,
+        CUBE: cube,
+    }
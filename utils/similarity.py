@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Rows scored per block, bounding the dense score buffer to BLOCK_ROWS × batch queries
+BLOCK_ROWS = 100_000
+QUERY_BATCH = 256
+# Below this many documents, keep terms that appear only once
+MIN_DF_ROWS = 1_000
+
+
+class SimilarityIndex:
+    """Sparse TF-IDF index over priority texts with batched cosine top-k queries on CPU.
+
+    Rows are L2-normalised, so a sparse dot product is the cosine similarity.
+    """
+
+    def __init__(self, texts, max_features=2 ** 18):
+        texts = pd.Series(texts).fillna('').astype(str)
+        self.vectorizer = TfidfVectorizer(
+            stop_words='english',
+            ngram_range=(1, 2),
+            min_df=2 if len(texts) > MIN_DF_ROWS else 1,
+            max_features=max_features,
+            sublinear_tf=True,
+            dtype=np.float32,
+        )
+        self.matrix = self.vectorizer.fit_transform(texts).tocsr()
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def _top_k(self, queries, k, exclude=None):
+        """Returns (indices, scores) arrays of shape (n queries, k) for a sparse query matrix."""
+        n_queries = queries.shape[0]
+        k = min(k, len(self))
+        best_idx = np.zeros((n_queries, 0), dtype=np.int64)
+        best_scores = np.zeros((n_queries, 0), dtype=np.float32)
+        queries_t = queries.T.tocsc()
+        for start in range(0, len(self), BLOCK_ROWS):
+            block = self.matrix[start:start + BLOCK_ROWS]
+            scores = (block @ queries_t).toarray().T
+            if exclude is not None:
+                rows = np.arange(n_queries)
+                local = exclude - start
+                inside = (local >= 0) & (local < block.shape[0])
+                scores[rows[inside], local[inside]] = -1.0
+            block_k = min(k, scores.shape[1])
+            top = np.argpartition(-scores, block_k - 1, axis=1)[:, :block_k]
+            best_idx = np.hstack([best_idx, top + start])
+            best_scores = np.hstack([best_scores, np.take_along_axis(scores, top, axis=1)])
+            if best_idx.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_idx = np.take_along_axis(best_idx, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        return np.take_along_axis(best_idx, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+    def search(self, texts, k=10):
+        """Top-k rows for each free-text query, in batches of QUERY_BATCH queries."""
+        results = []
+        for start in range(0, len(texts), QUERY_BATCH):
+            results.append(self._top_k(self.vectorizer.transform(texts[start:start + QUERY_BATCH]), k))
+        return np.vstack([r[0] for r in results]), np.vstack([r[1] for r in results])
+
+    def neighbours(self, rows, k=10):
+        """Top-k rows most similar to each of the given rows, excluding the row itself."""
+        rows = np.asarray(rows, dtype=np.int64)
+        results = []
+        for start in range(0, len(rows), QUERY_BATCH):
+            batch = rows[start:start + QUERY_BATCH]
+            results.append(self._top_k(self.matrix[batch], k, exclude=batch))
+        return np.vstack([r[0] for r in results]), np.vstack([r[1] for r in results])
+
+    def cluster(self, rows, n_clusters=8, top_terms=6, seed=0):
+        """Clusters the given rows with mini-batch k-means; returns (labels, top terms per cluster)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        n_clusters = max(1, min(n_clusters, len(rows)))
+        model = MiniBatchKMeans(n_clusters=n_clusters, random_state=seed, n_init=3, batch_size=4096)
+        labels = model.fit_predict(self.matrix[rows])
+        terms = self.vectorizer.get_feature_names_out()
+        top = np.argsort(-model.cluster_centers_, axis=1)[:, :top_terms]
+        return labels, [', '.join(terms[i]) for i in top]
+
+
+def matches_frame(df, indices, scores):
+    """Flattens top-k results for one query into rows of df with a 'Similarity' column."""
+    matches = df.iloc[indices].copy()
+    matches.insert(0, 'Similarity', np.round(scores, 3))
+    return matches[matches['Similarity'] > 0]
+
+
+def company_overlap(matches, company_col='Company'):
+    """Companies among the matches, ranked by their best and summed similarity."""
+    return (matches.groupby(company_col)['Similarity']
+            .agg(['max', 'sum', 'count'])
+            .rename(columns={'max': 'Best Similarity', 'sum': 'Total Similarity', 'count': 'Matches'})
+            .sort_values(['Best Similarity', 'Total Similarity'], ascending=False)
+            .reset_index())
@@ -0,0 +1,188 @@
+import hashlib
+import math
+import os
+import tempfile
+import threading
+import weakref
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from utils.dates import latest_mask, period_labels
+
+STORE_DIR = os.path.join(tempfile.gettempdir(), "priority_result_store")
+
+
+def result_key(namespace, uploads):
+    """Builds a content key from spooled uploads so identical uploads share one result."""
+    digest = hashlib.blake2b(namespace.encode('utf-8'), digest_size=20)
+    for upload in uploads:
+        digest.update(upload.name.encode('utf-8'))
+        digest.update(upload.digest.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def to_arrow(df):
+    """Converts a DataFrame to an Arrow table, stringifying mixed object columns Arrow cannot type.
+
+    Period columns are stored as sortable labels ('2024Q3') since Arrow has no quarter type.
+    """
+    arrays = []
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.PeriodDtype):
+            series = period_labels(series)
+        try:
+            arrays.append(pa.array(series, from_pandas=True))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+            arrays.append(pa.array(series.map(lambda v: None if _is_missing(v) else str(v)), type=pa.string()))
+    return pa.Table.from_arrays(arrays, names=[str(col) for col in df.columns])
+
+
+def filter_table(table, search_term='', columns=None):
+    """Returns a view of the table restricted to matching rows and the selected columns.
+
+    Column selection is zero-copy; the search is a vectorised case-insensitive
+    substring match over every string-castable column.
+    """
+    if search_term:
+        mask = None
+        for column in table.columns:
+            try:
+                text = pc.cast(column, pa.string())
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                continue
+            hits = pc.fill_null(pc.match_substring(text, search_term, ignore_case=True), False)
+            mask = hits if mask is None else pc.or_(mask, hits)
+        if mask is not None:
+            table = table.filter(mask)
+    if columns is not None:
+        table = table.select(columns)
+    return table
+
+
+def latest_rows(table, company_col, date_col):
+    """Returns the rows holding each company's most recent date; only the two key columns are converted."""
+    keys = table.select([company_col, date_col]).to_pandas()
+    return table.filter(pa.array(latest_mask(keys, company_col, date_col).to_numpy()))
+
+
+class ResultHandle:
+    """A session's reference to a stored result. Dropping or releasing it decrements the refcount."""
+
+    def __init__(self, store, key):
+        self.key = key
+        self._store = store
+        self._finalizer = weakref.finalize(self, store.release, key)
+
+    @property
+    def table(self):
+        return self._store.table(self.key)
+
+    @property
+    def meta(self):
+        return self._store.meta(self.key)
+
+    def release(self):
+        self._finalizer()
+
+
+class ResultStore:
+    """Process-wide, reference-counted store of read-only extraction results.
+
+    Each result is written once as an Arrow IPC file and read back through a
+    memory map, so every session holding a handle shares the same buffers.
+    """
+
+    def __init__(self, directory=STORE_DIR):
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._entries = {}
+        # Key -> lock held while that result is being built, so concurrent callers wait instead of rebuilding
+        self._building = {}
+
+    def acquire(self, key):
+        """Returns a new handle for key, or None if nothing is stored under it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry['refs'] += 1
+        return ResultHandle(self, key)
+
+    def put(self, key, df, meta=None):
+        """Stores the DataFrame under key (unless already present) and returns a handle to it."""
+        handle = self.acquire(key)
+        if handle is not None:
+            return handle
+
+        table = to_arrow(df)
+        os.makedirs(self._directory, exist_ok=True)
+        path = os.path.join(self._directory, f"{key}.arrow")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+        mapped = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = {'table': mapped, 'meta': meta, 'path': path, 'refs': 1}
+            else:
+                entry['refs'] += 1
+        return ResultHandle(self, key)
+
+    def get_or_create(self, key, build):
+        """Returns a handle for key, calling build() -> (df, meta) only if nothing is stored yet.
+
+        build() may instead store the result itself and return its handle, to keep
+        a resource held over the store write (see utils.widgets.admitted).
+        Builds are single-flight: callers arriving while key is being built wait
+        for that build and share its result. If it fails, the next waiter builds.
+        """
+        handle = self.acquire(key)
+        if handle is not None:
+            return handle
+        with self._lock:
+            building = self._building.setdefault(key, threading.Lock())
+        try:
+            with building:
+                handle = self.acquire(key)
+                if handle is None:
+                    result = build()
+                    handle = result if isinstance(result, ResultHandle) else self.put(key, *result)
+        finally:
+            with self._lock:
+                if self._building.get(key) is building:
+                    del self._building[key]
+        return handle
+
+    def table(self, key):
+        return self._entries[key]['table']
+
+    def meta(self, key):
+        return self._entries[key]['meta']
+
+    def release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry['refs'] -= 1
+            if entry['refs'] > 0:
+                return
+            del self._entries[key]
+        try:
+            os.remove(entry['path'])
+        except OSError:
+            pass
+
+
+# Imported modules persist across Streamlit reruns and sessions, so this is one store per server.
+RESULT_STORE = ResultStore()
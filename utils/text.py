@@ -0,0 +1,61 @@
+import pandas as pd
+
+# -------------------------- Text Normalisation -------------------------- #
+# Column-at-a-time replacements for the per-cell cleaners the pages used to
+# run through .apply. Non-text cells (NaN, numbers, dicts) pass through as-is.
+
+
+def _of_type(series, kind):
+    return series.map(type) == kind
+
+
+def join_list_text(series):
+    """Joins list cells with spaces, e.g. a 'Description' split into sentences; non-text items are joined as str."""
+    if series.dtype != object:
+        return series
+    is_list = _of_type(series, list)
+    if not is_list.any():
+        return series
+    series = series.copy()
+    # .str.join would turn a list holding any non-text item into NaN
+    series[is_list] = series[is_list].map(lambda items: ' '.join(map(str, items)))
+    # All-text results become a string column, as the per-cell .apply used to return
+    return series.infer_objects()
+
+
+def _strip_escapes(text):
+    return (
+        text
+        .str.replace("\\", "", regex=False)
+        .str.replace("b'", "", regex=False)
+        .str.replace("b\"", "", regex=False)
+        .str.strip("\\'\"")
+    )
+
+
+def unescape_binary_text(series):
+    """Decodes bytes cells and strips escaped byte-literal residue from text cells.
+
+    Matches the old convert_binary_to_text: backslashes, b' and b" are removed
+    (in that order) and leading/trailing backslashes and quotes are stripped.
+    """
+    if series.dtype != object:
+        return _strip_escapes(series) if pd.api.types.is_string_dtype(series) else series
+    series = series.copy()
+    is_bytes = _of_type(series, bytes)
+    if is_bytes.any():
+        series[is_bytes] = series[is_bytes].str.decode('utf-8', errors='ignore')
+
+    is_text = _of_type(series, str)
+    if is_text.any():
+        series[is_text] = _strip_escapes(series[is_text])
+    return series
+
+
+def clean_text_columns(df, columns, unescape=False):
+    """Joins list cells and optionally unescapes byte literals in the given columns, in place."""
+    for col in columns:
+        if col in df.columns:
+            cleaned = join_list_text(df[col])
+            df[col] = unescape_binary_text(cleaned) if unescape else cleaned
+    return df
@@ -0,0 +1,230 @@
+import hashlib
+import io
+import os
+import tempfile
+import weakref
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+SPOOL_DIR = os.path.join(tempfile.gettempdir(), "priority_upload_spool")
+CHUNK_SIZE = 8 * 1024 * 1024
+CHUNK_ROWS = 50_000
+
+# Extensions accepted by the uploaders; compressed names look like 'x.csv.gz' or 'x.jsonl.zst'
+UPLOAD_TYPES = ['csv', 'xlsx', 'json', 'jsonl', 'gz', 'zst', 'zip']
+READ_FORMATS = ['csv', 'xlsx', 'json', 'jsonl']
+COMPRESSIONS = {'gz': 'gzip', 'zst': 'zstd'}
+# Column naming the workbook sheet a row came from, added for multi-sheet workbooks
+SHEET_COLUMN = 'Sheet'
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class SpooledUpload:
+    """An upload copied to a temp file. The file is deleted once the object is dropped."""
+
+    def __init__(self, name, path, size, digest):
+        self.name = name
+        self.path = path
+        self.size = size
+        self.digest = digest
+        self._finalizer = weakref.finalize(self, _remove, path)
+
+    @property
+    def extension(self):
+        return self.name.split(".")[-1].lower()
+
+
+def spool_upload(uploaded_file):
+    """Streams an uploaded file to disk in chunks, hashing it on the way, then closes the upload."""
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    digest = hashlib.blake2b(digest_size=20)
+    size = 0
+    uploaded_file.seek(0)
+    with tempfile.NamedTemporaryFile(dir=SPOOL_DIR, suffix=f"_{os.path.basename(uploaded_file.name)}", delete=False) as spool:
+        while True:
+            chunk = uploaded_file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            spool.write(chunk)
+            size += len(chunk)
+    uploaded_file.close()
+    return SpooledUpload(uploaded_file.name, spool.name, size, digest.hexdigest())
+
+
+def spool_uploads(uploaded_files, cache):
+    """Spools each upload once, reusing `cache` (e.g. a session_state dict) across reruns.
+
+    Uploads no longer selected are dropped from the cache, which deletes their files.
+    """
+    spooled = {}
+    for uploaded_file in uploaded_files:
+        file_id = getattr(uploaded_file, 'file_id', None) or f"{uploaded_file.name}:{uploaded_file.size}"
+        spooled[file_id] = cache.get(file_id) or spool_upload(uploaded_file)
+    cache.clear()
+    cache.update(spooled)
+    return list(spooled.values())
+
+
+def split_name(file_name):
+    """Returns (format, compression) for names like 'x.csv', 'x.csv.gz' or 'x.jsonl.zst'."""
+    parts = file_name.lower().split(".")
+    compression = COMPRESSIONS.get(parts[-1])
+    if compression:
+        parts = parts[:-1]
+    return parts[-1], compression
+
+
+def list_members(path, file_name):
+    """Returns (display name, zip member) pairs for an upload; member is None for plain files."""
+    if not file_name.lower().endswith(".zip"):
+        return [(file_name, None)]
+    with zipfile.ZipFile(path) as archive:
+        return [(f"{file_name}/{member}", member) for member in archive.namelist()
+                if not member.endswith("/") and split_name(member)[0] in READ_FORMATS]
+
+
+def _sheet_names(source):
+    with pd.ExcelFile(source) as workbook:
+        return workbook.sheet_names
+
+
+def list_sheets(path, file_name, member=None):
+    """Returns the sheet names of an Excel upload or zip member; empty for other formats."""
+    if split_name(member or file_name)[0] != "xlsx":
+        return []
+    if member is None:
+        return _sheet_names(path)
+    with zipfile.ZipFile(path) as archive:
+        return _sheet_names(io.BytesIO(archive.read(member)))
+
+
+def list_parts(path, file_name, sheets=None):
+    """Returns (display name, zip member, sheet) triples: one per file, zip member and workbook sheet.
+
+    Sheet is None for non-Excel files and single-sheet workbooks, which read as
+    before. `sheets` limits multi-sheet workbooks to the named sheets.
+    """
+    parts = []
+    for display_name, member in list_members(path, file_name):
+        names = list_sheets(path, file_name, member)
+        if len(names) <= 1:
+            parts.append((display_name, member, None))
+        else:
+            parts.extend((display_name, member, sheet) for sheet in names if not sheets or sheet in sheets)
+    return parts
+
+
+def with_sheet(df, sheet):
+    """Adds a leading SHEET_COLUMN when the frame came from one sheet of a multi-sheet workbook."""
+    if sheet is not None and SHEET_COLUMN not in df.columns:
+        df.insert(0, SHEET_COLUMN, sheet)
+    return df
+
+
+def _select(df, usecols):
+    return df if usecols is None else df[[col for col in df.columns if col in usecols]]
+
+
+def _iter_source(source, file_name, chunksize, usecols=None, sheet=None, nrows=None):
+    file_format, compression = split_name(file_name)
+    column_filter = None if usecols is None else (lambda col: col in usecols)
+    if file_format == "csv":
+        memory_map = compression is None and isinstance(source, str)
+        with pd.read_csv(source, compression=compression, chunksize=chunksize, nrows=nrows, memory_map=memory_map, usecols=column_filter) as reader:
+            yield from reader
+    elif file_format == "jsonl":
+        with pd.read_json(source, lines=True, compression=compression, chunksize=chunksize, nrows=nrows) as reader:
+            for chunk in reader:
+                yield _select(chunk, usecols)
+    elif file_format == "json":
+        yield _select(pd.read_json(source, compression=compression), usecols).head(nrows)
+    elif file_format == "xlsx":
+        yield pd.read_excel(source, sheet_name=sheet or 0, usecols=column_filter, nrows=nrows)
+    else:
+        raise ValueError(f"Unsupported file type: {file_name}")
+
+
+def iter_chunks(path, file_name, member=None, chunksize=CHUNK_ROWS, usecols=None, sheet=None, nrows=None):
+    """Yields DataFrames of at most `chunksize` rows, decompressing as it reads.
+
+    CSV and JSON Lines stream chunk by chunk, so the decompressed file is never
+    held in memory at once; JSON and Excel can only be read whole. `usecols`
+    restricts the columns kept, skipping the heavy JSON ones when only keys are needed.
+    `sheet` picks a workbook sheet; the first one is read by default. `nrows` stops
+    after that many rows, which keeps a preview of a large workbook from reading every row.
+    """
+    if member is None:
+        yield from _iter_source(path, file_name, chunksize, usecols, sheet, nrows)
+        return
+    with zipfile.ZipFile(path) as archive:
+        if split_name(member)[0] == "xlsx":
+            # openpyxl needs a seekable file, and xlsx is already compressed
+            yield _select(pd.read_excel(io.BytesIO(archive.read(member)), sheet_name=sheet or 0, nrows=nrows), usecols)
+            return
+        with archive.open(member) as stream:
+            yield from _iter_source(stream, member, chunksize, usecols, nrows=nrows)
+
+
+def _check_columns(df, required_columns, display_name, sheet):
+    missing = [col for col in required_columns or [] if col not in df.columns]
+    if missing:
+        where = display_name if sheet is None else f"{display_name} [{sheet}]"
+        raise ValueError(f"{where}: Missing required columns: {', '.join(missing)}")
+
+
+def iter_upload(upload, chunksize=CHUNK_ROWS, usecols=None, sheets=None, required_columns=None, nrows=None):
+    """Yields DataFrame chunks from every readable file in a SpooledUpload (all members of a zip, all sheets of a workbook).
+
+    The first chunk of each file, member or sheet is checked for `required_columns`, so an error names the part at fault.
+    `nrows` caps the rows read from each part.
+    """
+    for display_name, member, sheet in list_parts(upload.path, upload.name, sheets):
+        for i, chunk in enumerate(iter_chunks(upload.path, upload.name, member, chunksize, usecols, sheet, nrows)):
+            if i == 0:
+                _check_columns(chunk, required_columns, display_name, sheet)
+            yield with_sheet(chunk, sheet)
+
+
+def scan_columns(uploads, columns):
+    """Reads only the given columns from every upload, e.g. to offer filter values before extraction."""
+    frames = [chunk for upload in uploads for chunk in iter_upload(upload, usecols=columns)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def _read_part(display_name, path, file_name, member, sheet, required_columns=None):
+    """Reads one file, zip member or sheet and checks its schema. Runs inside a worker process."""
+    frames = list(iter_chunks(path, file_name, member, sheet=sheet))
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    _check_columns(df, required_columns, display_name, sheet)
+    return with_sheet(df, sheet)
+
+
+def read_path(path, file_name, sheets=None, required_columns=None, max_workers=None):
+    """Reads a spooled file, every member of a spooled zip, or every sheet of a workbook into one DataFrame.
+
+    Parts are read in parallel worker processes when there is more than one, and
+    each is checked for `required_columns` on its own.
+    """
+    tasks = [(display_name, path, file_name, member, sheet, required_columns)
+             for display_name, member, sheet in list_parts(path, file_name, sheets)]
+    if len(tasks) <= 1:
+        frames = [_read_part(*task) for task in tasks]
+    else:
+        workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(_read_part, *zip(*tasks)))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def read_upload(upload, sheets=None, required_columns=None):
+    """Reads a SpooledUpload into a DataFrame."""
+    return read_path(upload.path, upload.name, sheets, required_columns)
@@ -0,0 +1,197 @@
+import streamlit as st
+
+from utils.admission import ADMISSION, estimate_job
+from utils.dates import parse_dates
+from utils.export import EXPORT_FORMATS, excel_sheets, frames_excel, partition_options, partitioned_zip
+from utils.preview import PREVIEW_ROWS, run_preview
+from utils.rollups import CUBE
+from utils.store import RESULT_STORE
+from utils.uploads import list_members, list_sheets, scan_columns
+
+# Rollup charts show at most this many bars
+CHART_LIMIT = 25
+
+
+def show_rollups(rollups, file_prefix):
+    """Renders the rollup tables as tabs with a bar chart each, plus an Excel download of all of them."""
+    if not rollups:
+        return
+
+    st.subheader("📊 Summary")
+    tabs = st.tabs(list(rollups))
+    for tab, (name, table) in zip(tabs, rollups.items()):
+        with tab:
+            if name != CUBE and not table.empty:
+                chart = table if name == 'By Period' else table.head(CHART_LIMIT)
+                st.bar_chart(chart.set_index(chart.columns[0])['Priorities'])
+            st.dataframe(table, use_container_width=True)
+
+    skipped = [name for name in rollups if name not in excel_sheets(rollups)]
+    if skipped:
+        st.caption(f"Left out of the Excel download, having more rows than a sheet holds: {', '.join(skipped)}")
+    # Built only when the download is clicked
+    st.download_button(
+        label="📥 Download Summary as Excel",
+        data=lambda: frames_excel(rollups),
+        file_name=f"{file_prefix}_summary.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        on_click="ignore",
+    )
+
+
+def partitioned_download(table, file_prefix):
+    """Offers a ZIP of per-partition files, built only when the download is clicked."""
+    options = partition_options(table)
+    if not options or table.num_rows == 0:
+        return
+
+    with st.expander("🗂️ Partitioned Export"):
+        col1, col2 = st.columns(2)
+        with col1:
+            label = st.radio("Split by", list(options), horizontal=True, key="partition_by")
+        with col2:
+            file_format = st.radio("File format", EXPORT_FORMATS, horizontal=True, key="partition_format")
+        column = options[label]
+        st.download_button(
+            label=f"📥 Download ZIP of {file_format.upper()} files by {label}",
+            data=lambda: partitioned_zip(table, column, file_format, file_prefix),
+            file_name=f"{file_prefix}_by_{label.lower()}.zip",
+            mime="application/zip",
+            on_click="ignore"
+        )
+
+
+@st.cache_data(show_spinner="Scanning filter columns...")
+def _filter_options(digests, categorical_cols, date_col, _uploads):
+    """Distinct values and date bounds of the filter columns, read without the JSON columns."""
+    columns = list(categorical_cols) + ([date_col] if date_col else [])
+    keys = scan_columns(_uploads, columns)
+    options = {}
+    for col in categorical_cols:
+        if col in keys.columns:
+            options[col] = sorted(keys[col].dropna().unique().tolist(), key=str)
+    if date_col in keys.columns:
+        dates = parse_dates(keys[date_col], coerce=True).dropna()
+        if not dates.empty:
+            options[date_col] = (dates.min().date(), dates.max().date())
+    return options
+
+
+def filter_controls(uploads, categorical_cols, date_col=None, outdated_col=None):
+    """Renders pre-extraction filters and returns the spec for utils.filters.apply_row_filters.
+
+    Unrestricted controls are left out of the spec, so an untouched panel keeps
+    the same result key as an unfiltered extraction. Listing the value filters'
+    options reads every row, so it only runs once the user asks for it and
+    never holds up the preview.
+    """
+    filters = {}
+    with st.expander("🎯 Pre-extraction Filters (applied before JSON decoding)"):
+        if outdated_col and st.checkbox(f"Exclude rows where '{outdated_col}' is true"):
+            filters[outdated_col] = False
+        if not st.toggle("Load filter values (reads these columns of every row)"):
+            return filters
+        options = _filter_options(tuple(upload.digest for upload in uploads), tuple(categorical_cols), date_col, uploads)
+        for col in categorical_cols:
+            if col in options:
+                chosen = st.multiselect(f"Only these {col} values (all if empty)", options[col])
+                if chosen:
+                    filters[col] = chosen
+        if date_col in options:
+            start, end = options[date_col]
+            chosen = st.date_input(f"{date_col} range", value=(start, end), min_value=start, max_value=end)
+            if len(chosen) == 2 and tuple(chosen) != (start, end):
+                filters[date_col] = tuple(chosen)
+    return filters
+
+
+@st.cache_data(show_spinner="Listing workbook sheets...")
+def _sheet_options(digests, _uploads):
+    """Sheet names across every multi-sheet workbook in the uploads, in workbook order."""
+    options = []
+    for upload in _uploads:
+        for _, member in list_members(upload.path, upload.name):
+            names = list_sheets(upload.path, upload.name, member)
+            if len(names) > 1:
+                options.extend(name for name in names if name not in options)
+    return options
+
+
+def sheet_controls(uploads):
+    """Lets the user pick which sheets of multi-sheet workbooks to extract; returns None for all of them."""
+    options = _sheet_options(tuple(upload.digest for upload in uploads), uploads)
+    if not options:
+        return None
+    chosen = st.multiselect(f"📑 Workbook sheets to extract ({len(options)} found)", options, default=options)
+    if not chosen:
+        st.warning("⚠️ No sheets selected; extracting all of them.")
+    return None if not chosen or len(chosen) == len(options) else chosen
+
+
+@st.cache_data(show_spinner="Previewing a sample...")
+def _cached_preview(key, rows, random_sample, json_columns, allow_python_repr, _uploads, _extract):
+    return run_preview(_uploads, _extract, list(json_columns), rows, random_sample, allow_python_repr)
+
+
+def confirm_full_run(key, uploads, extract, json_columns, allow_python_repr=False):
+    """Shows a quick sample preview and returns True once the user launches the full extraction for `key`."""
+    if st.session_state.get('confirmed_run') == key:
+        return True
+
+    st.subheader("⚡ Quick Preview")
+    col1, col2 = st.columns(2)
+    with col1:
+        rows = st.number_input("Preview rows", min_value=10, max_value=10_000, value=PREVIEW_ROWS, step=100)
+    with col2:
+        random_sample = st.checkbox("Random sample instead of the first rows")
+
+    try:
+        output, metrics = _cached_preview(key, int(rows), random_sample, tuple(json_columns), allow_python_repr, uploads, extract)
+        # Kept for the admission estimate of the full run
+        st.session_state['preview_metrics'] = (key, metrics)
+        metric_cols = st.columns(4)
+        metric_cols[0].metric("Sample Output Rows", f"{metrics['Sample Output Rows']:,} from {metrics['Sample Rows']:,}")
+        metric_cols[1].metric("Malformed Cells", f"{metrics['Malformed Cell Rate']:.1%}")
+        projected = metrics['Projected Output Rows']
+        metric_cols[2].metric("Projected Output Rows", "n/a" if projected is None else f"{projected:,}")
+        runtime = metrics['Estimated Full Runtime (s)']
+        metric_cols[3].metric("Estimated Full Runtime", "n/a" if runtime is None else f"{runtime:,.1f} s")
+        st.dataframe(output, use_container_width=True)
+    except Exception as e:
+        st.error(f"❌ Preview failed, please check the file: {e}")
+
+    if st.button("🚀 Run Full Extraction", type="primary"):
+        st.session_state['confirmed_run'] = key
+        return True
+    st.info("👆 Check the preview, then run the full extraction.")
+    return False
+
+
+def admitted(key, uploads, build):
+    """Wraps build(job) -> (df, meta) for RESULT_STORE.get_or_create so it only runs once admitted.
+
+    While the job is queued the user sees their position; a job admitted in
+    downscaled mode should read in `job.chunk_rows` chunks with `job.max_workers` workers.
+    The slot is held until the result is written to the store, whose Arrow copy is part of the job's peak.
+    """
+    def run():
+        preview_key, metrics = st.session_state.get('preview_metrics', (None, None))
+        estimate = estimate_job(uploads, metrics if preview_key == key else None)
+        status = st.empty()
+
+        def on_wait(position):
+            queued, running, reserved_mb = ADMISSION.status()
+            status.info(
+                f"⏳ The server is busy: you are #{position} of {queued} in the queue "
+                f"({running} extraction(s) running, {reserved_mb:,.0f} of {ADMISSION.memory_budget_mb:,.0f} MB reserved). "
+                f"This job needs about {estimate.memory_mb:,.0f} MB and {estimate.seconds:,.0f} s."
+            )
+
+        with ADMISSION.slot(estimate, on_wait) as job:
+            if job.downscaled:
+                status.warning(f"⚠️ Not enough free memory for a full-speed run (about {estimate.memory_mb:,.0f} MB); extracting in low-memory chunked mode, which is slower.")
+            else:
+                status.empty()
+            df, meta = build(job)
+            return RESULT_STORE.put(key, df, meta)
+    return run